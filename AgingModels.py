@@ -6,9 +6,14 @@
 # -------------
 # Description: 
 #   This script is used to define the function for the ageing model of the SES
+#   'linear': full equivalent cycles from the battery throughput
+#   'rainflow': cycles of the soc curve counted by rainflow counting, weighted
+#   with the depth of discharge and mean soc of every cycle. The soc of the
+#   prescient algorithms is monotonic within every 15 minute block, so only
+#   the soc at the end of the blocks is counted.
 #-------------
 # Input: 
-#   time, Battery, soc, size
+#   time, Battery, soc, size, params
 # ------------
 # Output: 
 #   t_eol
@@ -16,16 +21,57 @@
 
 # %% Import libraries
 
-import config as cf
+import Parameters
 import numpy as np
+import Kernels
+import Profiles
+
+block_algorithms = ('prescient', 'prescient_block') # soc monotonic within the blocks
+trapezoid = getattr(np, 'trapezoid', None) or np.trapz # np.trapz was renamed in numpy 2.0
 
 # Linear aging model
-def linear(time, Battery, soc, size):    
-    FEC = np.trapz(abs(Battery),time)/3600/size/2
+def linear(time, Battery, soc, size, params=None):
+    if params is None:
+        params = Parameters.default()
+    FEC = throughput(time, Battery)/3600/size/2
     n_days = (time[-1]-time[0])/3600/24        
+    
+    return linear_fec(FEC, n_days, params)
+
+# Integral of the absolute battery power (trapezoidal rule) in kWs
+def throughput(time, Battery):
+    if Kernels.enabled:
+        return Kernels.throughput(np.asarray(Battery,dtype=float), np.asarray(time,dtype=float))
+    return trapezoid(abs(Battery),time)
+
+# Linear aging model for given full equivalent cycles (FEC) in n_days
+def linear_fec(FEC, n_days, params=None):
+    if params is None:
+        params = Parameters.default()
     nperday = FEC/n_days 
     
-    t_eol = cf.nmax/(cf.nmax/cf.tmax+nperday)
+    t_eol = params.nmax/(params.nmax/params.tmax+nperday)
     
     return t_eol/365
-    
\ No newline at end of file
+    
+
+# Rainflow aging model
+def rainflow(time, Battery, soc, size, params=None):
+    if params is None:
+        params = Parameters.default()
+    soc = np.asarray(soc, dtype=float)
+    if params.algorithm in block_algorithms:
+        n = Profiles.samples(Profiles.block_duration, Profiles.step(time))
+        soc = np.append(soc[n-1::n], soc[-1]) if len(soc) % n else soc[n-1::n]
+    n_days = (time[-1]-time[0])/3600/24
+    
+    return linear_fec(rainflow_fec(soc, params), n_days, params)
+
+# Stress weighted full equivalent cycles of a soc curve starting at soc_max
+def rainflow_fec(soc, params=None):
+    if params is None:
+        params = Parameters.default()
+    if np.isnan(soc[-1]):
+        return np.nan
+    return Kernels.rainflow(np.asarray(soc, dtype=float), float(params.soc_max),
+                            float(params.k_dod), float(params.k_soc), float(params.soc_ref))
@@ -6,52 +6,196 @@
 # -------------
 # Description: 
 #   In this function the charging algorithm of the the SES is implemented. 
+#   'prescient' is the reference implementation, 'prescient_block' evaluates
+#   the same algorithm on the demand profile reshaped into 15 minute blocks.
+#   'prescient_batch' simulates many (lim, size) candidates at once and only
+#   returns block-wise summaries of the grid power.
+#   'lp' determines the dispatch with minimal grid costs by a linear program 
+#   (see 'LinearProgram').
 # -------------
 # Input: 
-#   lim, size, time, Demand
+#   lim, size, time, Demand, params
 # ------------
 # Output: 
 #   Battery, Grid, soc
 # ------------
 
 # %% Import libraries
-import config as cf
+import Parameters
 import numpy as np
+import Kernels
+import Profiles
 
 # Algorithm for charging and discharging the SES
-def prescient(lim, size, time, Demand):
-    max_char_pow = size * cf.Crate_max #in kW
-    max_dischar_pow = size * cf.Crate_min# in kW
+def prescient(lim, size, time, Demand, params=None):
+    if params is None:
+        params = Parameters.default()
+    max_char_pow = size * params.Crate_max #in kW
+    max_dischar_pow = size * params.Crate_min# in kW
+    profile = Profiles.get(time, Demand, params)
+    n, h = profile.block, profile.per_hour # samples per block and per hour
     
     Battery = np.zeros(len(Demand)) #power from and to battery in kW
-    soc =  np.full(len(Demand),cf.soc_max) #soc
-    for i in range(0,len(Demand),90):
-        period_Demand = Demand[i:i+90]
+    soc =  np.full(len(Demand),params.soc_max) #soc
+    for i in range(0,len(Demand),n):
+        period_Demand = Demand[i:i+n]
         dur = len(period_Demand)
         mean_Demand = np.mean(period_Demand)
         
-        if mean_Demand>lim and soc[i-1]>cf.soc_min: #Discharge battery
-            myeta = 1/cf.eta
+        if mean_Demand>lim and soc[i-1]>params.soc_min: #Discharge battery
+            myeta = 1/params.eta
             P_requested = (lim - mean_Demand) * dur / sum(period_Demand>0) # Requested peak shaving power
-            P_soc_max = (cf.soc_min-soc[i-1])*size/(dur/360)*cf.eta # Maximum power without violating min. SOC limit
+            P_soc_max = (params.soc_min-soc[i-1])*size/(dur/h)*params.eta # Maximum power without violating min. SOC limit
             Pbat = max(P_requested, max_dischar_pow, P_soc_max) # Allowed battery power
             Battery[i:i+dur] = np.maximum(-period_Demand, np.full(dur, Pbat)) #Prevent feeding energy back into the grid
-        elif mean_Demand < lim and soc[i-1]<cf.soc_max:
-            myeta = cf.eta
+        elif mean_Demand < lim and soc[i-1]<params.soc_max:
+            myeta = params.eta
             P_allowed = lim - mean_Demand # Allowed charging power
-            P_soc_max = (cf.soc_max-soc[i-1])*size/(dur/360)/cf.eta # Allowed charging power without violating max. SOC limit
+            P_soc_max = (params.soc_max-soc[i-1])*size/(dur/h)/params.eta # Allowed charging power without violating max. SOC limit
             Pbat = min(P_allowed, max_char_pow, P_soc_max) #Allowed battery power
             Battery[i:i+dur] = np.full(dur, Pbat)   
         else: myeta = 0
         
-        soc[i:i+dur] = soc[i-1] + myeta*np.cumsum(Battery[i:i+dur]/360/size)
+        soc[i:i+dur] = soc[i-1] + myeta*np.cumsum(Battery[i:i+dur]/h/size)
         
     Grid = Demand + Battery 
     
     # #Catch configurations that can't fully recharge their batteries
-    if any(soc)<cf.soc_min or soc[-1]<cf.soc_max:
+    if any(soc)<params.soc_min or soc[-1]<params.soc_max:
         Battery = np.full(len(Demand),np.nan)
         Grid = np.full(len(Demand),np.nan)
         soc = np.full(len(Demand),np.nan)
     
     return(Battery, Grid, soc)
+
+
+# Block-wise implementation of the prescient algorithm. Block means and counts
+# are precomputed, only the soc recurrence is evaluated block by block.
+def prescient_block(lim, size, time, Demand, params=None):
+    if params is None:
+        params = Parameters.default()
+    
+    profile = Profiles.get(time, Demand, params)
+    blocks, dur, mean_Demand, n_charging = profile.blocks, profile.dur, profile.mean_Demand, profile.n_charging
+    
+    if Kernels.enabled:
+        # Compiled kernel of the loop below
+        Battery, soc = Kernels.prescient(float(lim), float(size), blocks, dur, mean_Demand, n_charging, 
+                                         profile.per_hour, params.soc_max, params.soc_min, 
+                                         params.Crate_max, params.Crate_min, params.eta)
+    else:
+        Battery, soc = _prescient_loop(lim, size, blocks, dur, mean_Demand, n_charging, 
+                                       profile.per_hour, params)
+    
+    Battery = Battery.ravel()[:len(Demand)]
+    soc = soc.ravel()[:len(Demand)]
+    Grid = Demand + Battery 
+    
+    # #Catch configurations that can't fully recharge their batteries
+    if any(soc)<params.soc_min or soc[-1]<params.soc_max:
+        Battery = np.full(len(Demand),np.nan)
+        Grid = np.full(len(Demand),np.nan)
+        soc = np.full(len(Demand),np.nan)
+    
+    return(Battery, Grid, soc)
+
+# Soc recurrence of the block-wise prescient algorithm
+def _prescient_loop(lim, size, blocks, dur, mean_Demand, n_charging, per_hour, params):
+    max_char_pow = size * params.Crate_max #in kW
+    max_dischar_pow = size * params.Crate_min# in kW
+    
+    Battery = np.zeros(blocks.shape) #power from and to battery in kW
+    soc = np.empty(blocks.shape) #soc
+    
+    soc_prev = params.soc_max
+    for b, (mean, d, n) in enumerate(zip(mean_Demand.tolist(), dur.tolist(), n_charging.tolist())):
+        if mean>lim and soc_prev>params.soc_min: #Discharge battery
+            myeta = 1/params.eta
+            P_requested = (lim - mean) * d / n # Requested peak shaving power
+            P_soc_max = (params.soc_min-soc_prev)*size/(d/per_hour)*params.eta # Maximum power without violating min. SOC limit
+            Pbat = max(P_requested, max_dischar_pow, P_soc_max) # Allowed battery power
+            Battery[b] = np.maximum(-blocks[b], Pbat) #Prevent feeding energy back into the grid
+        elif mean < lim and soc_prev<params.soc_max:
+            myeta = params.eta
+            P_allowed = lim - mean # Allowed charging power
+            P_soc_max = (params.soc_max-soc_prev)*size/(d/per_hour)/params.eta # Allowed charging power without violating max. SOC limit
+            Pbat = min(P_allowed, max_char_pow, P_soc_max) #Allowed battery power
+            Battery[b] = Pbat
+        else:
+            soc[b] = soc_prev
+            continue
+        
+        soc[b] = soc_prev + myeta*np.cumsum(Battery[b]/per_hour/size)
+        soc_prev = soc[b,d-1]
+    
+    return(Battery, soc)
+
+# Block-wise prescient algorithm for many candidates (lims, sizes) at once. 
+# Instead of the full power curves, block sums and maxima of the grid power, 
+# the battery throughput and the soc at the end of each block are returned.
+def prescient_batch(lims, sizes, time, Demand, params=None):
+    if params is None:
+        params = Parameters.default()
+    lims = np.asarray(lims, dtype=float)
+    sizes = np.asarray(sizes, dtype=float)
+    max_char_pow = sizes * params.Crate_max #in kW
+    max_dischar_pow = sizes * params.Crate_min# in kW
+    
+    profile = Profiles.get(time, Demand, params)
+    blocks, dur, mean_Demand, n_charging = profile.blocks, profile.dur, profile.mean_Demand, profile.n_charging
+    weights = profile.weights # trapezoidal integration weights in s
+    h = profile.per_hour # samples per hour
+    
+    Grid_sum = np.tile(np.sum(blocks,axis=1),(len(lims),1)) #sum of grid power per block
+    Grid_max = np.tile(np.max(blocks,axis=1),(len(lims),1)) #maximum grid power per block
+    soc_end = np.empty((len(lims),len(dur))) #soc at the end of each block
+    throughput = np.zeros(len(lims)) #integral of the absolute battery power in kWs
+    
+    soc_prev = np.full(len(lims),params.soc_max)
+    for b in range(len(dur)):
+        d = dur[b]
+        dis = (mean_Demand[b]>lims) & (soc_prev>params.soc_min) #Discharge battery
+        char = (mean_Demand[b]<lims) & (soc_prev<params.soc_max) & ~dis #Charge battery
+        active = np.flatnonzero(dis|char)
+        if len(active) == 0:
+            soc_end[:,b] = soc_prev
+            continue
+        lim, size, soc_act = lims[active], sizes[active], soc_prev[active]
+        dis, char = dis[active], char[active]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            P_requested = (lim - mean_Demand[b]) * d / n_charging[b] # Requested peak shaving power
+        P_soc_dis = (params.soc_min-soc_act)*size/(d/h)*params.eta # Maximum power without violating min. SOC limit
+        P_soc_char = (params.soc_max-soc_act)*size/(d/h)/params.eta # Allowed charging power without violating max. SOC limit
+        Pbat = np.where(dis,
+                        np.maximum(np.maximum(P_requested, max_dischar_pow[active]), P_soc_dis),
+                        np.minimum(np.minimum(lim - mean_Demand[b], max_char_pow[active]), P_soc_char))
+        myeta = np.where(dis, 1/params.eta, params.eta)
+        
+        Battery = np.where(dis[:,None],
+                           np.maximum(-blocks[b], Pbat[:,None]), #Prevent feeding energy back into the grid
+                           np.tile(Pbat[:,None],(1,blocks.shape[1])))
+        Battery[:,d:] = 0
+        soc = soc_act + myeta*np.cumsum(Battery/h/size[:,None],axis=1)[:,d-1]
+        
+        Grid_sum[active,b] += np.sum(Battery,axis=1)
+        Grid_max[active,b] = np.max(blocks[b,:d] + Battery[:,:d],axis=1)
+        throughput[active] += np.abs(Battery) @ weights[b]
+        soc_prev[active] = soc
+        soc_end[:,b] = soc_prev
+    
+    # #Catch configurations that can't fully recharge their batteries
+    infeasible = soc_end[:,-1]<params.soc_max
+    Grid_sum[infeasible] = np.nan
+    Grid_max[infeasible] = np.nan
+    soc_end[infeasible] = np.nan
+    throughput[infeasible] = np.nan
+    
+    return(Grid_sum, Grid_max, throughput, soc_end)
+
+# Dispatch with minimal grid costs by linear programming
+def lp(lim, size, time, Demand, params=None):
+    if params is None:
+        params = Parameters.default()
+    import LinearProgram # scipy is only imported if the linear program is used
+    return LinearProgram.dispatch(lim, size, time, Demand, params)
@@ -0,0 +1,155 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used to measure the execution time of the main stages on 
+#   synthetic power profiles, so that speedups and regressions can be measured
+#   without the input data. The synthetic profiles have the same structure as 
+#   the input data (10 s resolution, Powerprofile[BLEL][ter]) and are generated
+#   deterministically from a seed. The following stages are timed:
+#   - Algorithms.prescient and Algorithms.prescient_block
+#   - Objective.function
+#   - Aging models ('linear' and 'rainflow') for one dispatch
+#   - Optimisation of a single terminal
+#   - Contour grid (51x51) of the sensitivity analysis
+#   - Sweep over all synthetic terminals and BLELs
+#   Usage: python Benchmark.py [--terminals 4] [--days 5] [--workers 1] 
+#          [--chargers 3] [--events-per-day 40]
+#          [--output Results/benchmark.json] [--compare Results/benchmark_old.json]
+# ------------
+# Input: 
+#   settings of the synthetic profiles (command line)
+# ------------
+# Output: 
+#   Execution times in seconds (json file), comparison with a previous run
+# ------------
+
+# %% Import libraries
+import argparse
+import json
+import os
+import platform
+import time as timer
+import numpy as np
+
+import AgingModels
+import Algorithms
+import Kernels
+import Objective
+import Parameters
+import Profiles
+import Sensitivity
+import Sweep
+
+# %% Synthetic power profiles
+
+def synthetic_powerprofile(n_terminals=4, BLELs=('BLEL100','BLEL050'), days=5, n_chargers=3,
+                           events_per_day=40, seed=0):
+    rng = np.random.RandomState(seed)
+    time = np.arange(days*24*360)*10.0 # 10 s resolution
+    Powerprofile = {}
+    for BLEL in BLELs:
+        share = int(BLEL[-3:])/100 # share of electrified bus lines
+        Powerprofile[BLEL] = {}
+        for i in range(n_terminals):
+            Demand = np.zeros(len(time))
+            chargers = max(1, int(round(n_chargers*share)))
+            for _ in range(chargers):
+                # Charging events with random start, duration (3 to 10 min) and power
+                n_events = rng.poisson(events_per_day*days*share)
+                start = rng.randint(0, len(time)-60, n_events)
+                duration = rng.randint(18, 60, n_events)
+                power = rng.uniform(150, 450, n_events)
+                for s, d, p in zip(start, duration, power):
+                    Demand[s:s+d] += p
+            Powerprofile[BLEL]['ter_%05d' % i] = {'time': time, 'Demand': Demand, 'Nchargers': chargers}
+    return Powerprofile
+
+# %% Timing
+
+# Best time of several repetitions in seconds. The cached profiles and
+# dispatch summaries are removed before every repetition (also for the forked
+# workers of the sweep), so every repetition does the full work
+def measure(function, repeat=3):
+    times = []
+    for _ in range(repeat):
+        Objective.clear_cache()
+        Profiles.clear_cache()
+        start = timer.perf_counter()
+        function()
+        times.append(timer.perf_counter() - start)
+    return min(times)
+
+def run(n_terminals=4, days=5, n_workers=1, seed=0, n_chargers=3, events_per_day=40):
+    Powerprofile = synthetic_powerprofile(n_terminals=n_terminals, days=days, n_chargers=n_chargers,
+                                          events_per_day=events_per_day, seed=seed)
+    params = Parameters.default(delta_t=30)
+    BLEL = sorted(Powerprofile.keys())[0]
+    ter = list(Powerprofile[BLEL].keys())[0]
+    time = Powerprofile[BLEL][ter]['time']
+    Demand = Powerprofile[BLEL][ter]['Demand']
+    Peakdemand_z = Profiles.get(time, Demand, params).Peakdemand_z
+    lim, size = 0.9*Peakdemand_z, 200
+    
+    lim_axis, size_axis = np.linspace(np.mean(Demand),Peakdemand_z,51), np.linspace(0,400,51)
+    lims, sizes = np.meshgrid(lim_axis, size_axis, indexing='ij')
+    Battery, _, soc = Algorithms.prescient(lim, size, time, Demand, params)
+    params_rainflow = Parameters.default(delta_t=30, agingmodel='rainflow')
+    
+    stages = {
+        'prescient': lambda: Algorithms.prescient(lim, size, time, Demand, params),
+        'prescient_block': lambda: Algorithms.prescient_block(lim, size, time, Demand, params),
+        'objective': lambda: Objective.function([lim, size], time, Demand, [], 'opt', params),
+        'aging_linear': lambda: AgingModels.linear(time, Battery, soc, size, params),
+        'aging_rainflow': lambda: AgingModels.rainflow(time, Battery, soc, size, params_rainflow),
+        'single_terminal': lambda: Sweep.optimise(time, Demand, [], [], params),
+        'contour_grid': lambda: Objective.batch(lims.ravel(), sizes.ravel(), time, Demand, [], params),
+        'contour_adaptive': lambda: Sensitivity.adaptive(lim_axis, size_axis, time, Demand, [], params),
+        'sweep': lambda: Sweep.run(Powerprofile, delta_ts=[30], n_workers=n_workers, params=params,
+                                   warm_start=False),
+        'sweep_warm': lambda: Sweep.run(Powerprofile, delta_ts=[30], n_workers=n_workers, params=params,
+                                        warm_start=True),
+        }
+    repeats = {'single_terminal': 1, 'contour_grid': 1, 'contour_adaptive': 1, 'sweep': 1, 'sweep_warm': 1}
+    
+    results = {'settings': {'terminals': n_terminals, 'days': days, 'workers': n_workers, 'seed': seed,
+                            'chargers': n_chargers, 'events_per_day': events_per_day},
+               'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                               'numba': Kernels.enabled, 'cpus': os.cpu_count(),
+                               'algorithm': params.algorithm, 'optimizer': params.optimizer},
+               'times': {}}
+    for stage, function in stages.items():
+        results['times'][stage] = measure(function, repeats.get(stage, 3))
+        print('%-16s %10.6f s' % (stage, results['times'][stage]))
+    return results
+
+# Ratio of the execution times of a previous run and the current run
+def compare(previous, current):
+    print('%-16s %10s %10s %8s' % ('stage', 'previous', 'current', 'speedup'))
+    for stage, t in current['times'].items():
+        if stage in previous['times']:
+            print('%-16s %10.6f %10.6f %8.2f' % (stage, previous['times'][stage], t, previous['times'][stage]/t))
+
+# %% Command line
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark on synthetic power profiles')
+    parser.add_argument('--terminals', type=int, default=4)
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chargers', type=int, default=3)
+    parser.add_argument('--events-per-day', type=float, default=40)
+    parser.add_argument('--output', default='Results/benchmark.json')
+    parser.add_argument('--compare', default=None)
+    args = parser.parse_args()
+    
+    results = run(args.terminals, args.days, args.workers, args.seed, args.chargers, args.events_per_day)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), results)
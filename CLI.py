@@ -0,0 +1,214 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description:
+#   Command line interface for the stages of 'Main'. Every subcommand only
+#   imports the modules it needs (e.g. no pandas, scipy or matplotlib to
+#   evaluate one configuration of a terminal), so short jobs start quickly.
+#   The profiles are taken from the memory-mapped store (see 'ProfileStore').
+#   - sweep:       optimal SES of the selected terminals, BLELs and delta_t
+#   - evaluate:    costs of one terminal for a given limit and size, the
+#                  optimum from saved results or a new optimisation
+#   - sensitivity: cost surfaces of the selected terminals (array file)
+#   - plot:        result plots and power curves from saved results
+#   The TRU costs of the other BLELs are taken from the highest BLEL, so the
+#   highest BLEL is always optimised by 'sweep' and 'evaluate' (for a given
+#   limit and size, the TRU is sized for the grid power of the terminal).
+#   Usage: python CLI.py sweep --delta-t 30 --BLEL BLEL050 --terminal ter_16009
+#          python CLI.py evaluate BLEL050 ter_16009 --lim 300 --size 150
+#          python CLI.py evaluate BLEL050 ter_16009 --results Results/results.csv
+#          python CLI.py sensitivity --BLEL BLEL050 --method adaptive
+#          python CLI.py plot --results Results/results.csv --curves
+# ------------
+# Input:
+#   command line arguments
+# ------------
+# Output:
+#   result files, plots, costs (printed)
+# ------------
+
+# %% Import libraries
+import argparse
+import os
+
+import config as cf
+
+# %% Helpers
+
+def _powerprofile():
+    import ProfileStore
+    return ProfileStore.load('Input/PowerProfile', cf.profile_store, cf.profile_dtype, cf.profile_aggregate)
+
+# Selected terminals and BLELs of the profiles (default: all), with the highest
+# BLEL of the selected terminals if required
+def _select(Powerprofile, BLELs=None, terminals=None, highest=False):
+    keep = set(BLELs) if BLELs is not None else set(Powerprofile.keys())
+    if highest:
+        keep.add(max(Powerprofile.keys()))
+    selected = {}
+    for BLEL in sorted(keep, reverse=True):
+        if BLEL not in Powerprofile:
+            raise KeyError('Unknown BLEL %s' % BLEL)
+        ters = [ter for ter in Powerprofile[BLEL].keys() if terminals is None or ter in terminals]
+        if ters:
+            selected[BLEL] = {ter: Powerprofile[BLEL][ter] for ter in ters}
+    return selected
+
+# Results saved by 'sweep' (.csv file or directory of partitioned files)
+def _results(path):
+    import pandas as pd
+    import ResultStore
+    if os.path.isdir(path):
+        return ResultStore.read(path)
+    return pd.read_csv(path, index_col=0)
+
+# %% Subcommands
+
+def sweep(args):
+    import Instrumentation
+    import Parameters
+    import ResultStore
+    import Sweep
+
+    Powerprofile = _select(_powerprofile(), args.BLEL, args.terminal, highest=True)
+    results = Sweep.run(Powerprofile, delta_ts=args.delta_t, n_workers=args.workers,
+                        params=Parameters.default(), cache=cf.cache_dir)
+    df = results.frame()
+    df['share_of_demand'] = df['C_dem']/df['C_tot']
+    df['share_of_demand_z'] = df['C_dem_z']/df['C_tot_z']
+    df = df.sort_values('BLEL')
+
+    if args.format:
+        ResultStore.write(df, args.directory, args.format)
+    if args.output:
+        df.to_csv(args.output)
+    if results.profiling:
+        Instrumentation.write(results.profiling, 'Results/profiling.csv')
+
+def evaluate(args):
+    import Objective
+    import Parameters
+
+    params = Parameters.default(delta_t=args.delta_t)
+    Powerprofile = _powerprofile()
+    profile = Powerprofile[args.BLEL][args.terminal]
+    if args.lim is not None and args.size is not None:
+        lim, size = args.lim, args.size
+        C_tru = []
+    else:
+        # Optimum from the saved results or a new optimisation
+        if args.results:
+            import ResultStore
+            results = ResultStore.from_frame(_results(args.results))
+        else:
+            import Sweep
+            results = Sweep.run(_select(Powerprofile, [args.BLEL], [args.terminal], highest=True),
+                                delta_ts=[args.delta_t], n_workers=1, params=params, cache=cf.cache_dir)
+        result = results.get(args.BLEL, args.terminal, args.delta_t)
+        lim, size = result['opt_lim'], result['opt_size']
+        C_tru = result['C_tru'] if args.BLEL != max(Powerprofile.keys()) else []
+
+    names = ('C_tot', 'C_dem', 'C_energy', 'C_bat', 'C_tru', 'C_dcdc', 't_eol_bat')
+    costs = Objective.costs([lim, size], profile['time'], profile['Demand'], C_tru, params)
+    print('%-10s %14.4f' % ('lim', lim))
+    print('%-10s %14.4f' % ('size', size))
+    for name, value in zip(names, costs):
+        print('%-10s %14.4f' % (name, value))
+
+    if args.plot:
+        import PlotExport
+        PlotExport.power_curves(profile['time'], profile['Demand'], lim, size, args.plot, params)
+
+def sensitivity(args):
+    import Parameters
+    import Sensitivity
+
+    results = None
+    if args.results:
+        import ResultStore
+        results = ResultStore.from_frame(_results(args.results))
+    Sensitivity.run(_powerprofile(), args.output, BLELs=args.BLEL, terminals=args.terminal,
+                    delta_t=args.delta_t, results=results, n_workers=args.workers,
+                    params=Parameters.default(), method=args.method, tol=args.tol)
+
+def plot(args):
+    import PlotExport
+    import ResultStore
+
+    df = _results(args.results)
+    if 'share_of_demand' not in df.columns:
+        df['share_of_demand'] = df['C_dem']/df['C_tot']
+        df['share_of_demand_z'] = df['C_dem_z']/df['C_tot_z']
+    # Results of the selected terminals and BLELs only
+    if args.BLEL is not None:
+        df = df[df['BLEL'].isin(args.BLEL)]
+    if args.terminal is not None:
+        df = df[df['terminal'].isin(args.terminal)]
+    if args.curves:
+        # Power curves of the saved results only
+        Powerprofile = _powerprofile()
+        saved = {}
+        for BLEL, ter in df.loc[df['delta_t'] == args.delta_t, ['BLEL', 'terminal']].itertuples(index=False):
+            saved.setdefault(BLEL, {})[ter] = Powerprofile[BLEL][ter]
+        PlotExport.run(saved, ResultStore.from_frame(df), args.output, BLELs=args.BLEL,
+                       terminals=args.terminal, delta_t=args.delta_t, df=df, n_workers=args.workers)
+    else:
+        PlotExport.result_plots(df, args.output)
+
+# %% Command line
+
+def parser():
+    main = argparse.ArgumentParser(description='SES sizing for end-station fast charging')
+    commands = main.add_subparsers(dest='command', required=True)
+
+    # Filters of the terminals and BLELs
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument('--BLEL', nargs='+', default=None)
+    selection.add_argument('--terminal', nargs='+', default=None)
+    selection.add_argument('--workers', type=int, default=cf.n_workers)
+
+    command = commands.add_parser('sweep', parents=[selection], help='optimal SES of all selected terminals')
+    command.add_argument('--delta-t', type=int, nargs='+', default=[15, 30])
+    command.add_argument('--output', default='Results/results.csv', help='csv file (empty: none)')
+    command.add_argument('--format', default=cf.result_format, choices=['parquet', 'feather'])
+    command.add_argument('--directory', default='Results/results', help='directory of the partitioned files')
+    command.set_defaults(function=sweep)
+
+    command = commands.add_parser('evaluate', help='costs of one terminal')
+    command.add_argument('BLEL')
+    command.add_argument('terminal')
+    command.add_argument('--delta-t', type=int, default=cf.delta_t)
+    command.add_argument('--lim', type=float, default=None)
+    command.add_argument('--size', type=float, default=None)
+    command.add_argument('--results', default=None, help='saved results with the optimum')
+    command.add_argument('--plot', default=None, help='file of the power curve plot')
+    command.set_defaults(function=evaluate)
+
+    command = commands.add_parser('sensitivity', parents=[selection], help='cost surfaces of the selected terminals')
+    command.add_argument('--delta-t', type=int, default=cf.delta_t)
+    command.add_argument('--method', default=cf.sensitivity, choices=['full', 'adaptive'])
+    command.add_argument('--tol', type=float, default=cf.sensitivity_tol)
+    command.add_argument('--results', default=None, help='saved results with the optimum')
+    command.add_argument('--output', default='Results/sensitivity.npz')
+    command.set_defaults(function=sensitivity)
+
+    command = commands.add_parser('plot', parents=[selection], help='plots of the selected saved results')
+    command.add_argument('--results', default='Results/results.csv')
+    command.add_argument('--delta-t', type=int, default=cf.delta_t)
+    command.add_argument('--curves', action='store_true', help='power curves of the selected terminals')
+    command.add_argument('--output', default='Results/plots')
+    command.set_defaults(function=plot)
+    return main
+
+def main(argv=None):
+    cli = parser()
+    args = cli.parse_args(argv)
+    if args.command == 'evaluate' and (args.lim is None) != (args.size is None):
+        cli.error('evaluate: --lim and --size have to be given together')
+    args.function(args)
+
+if __name__ == '__main__':
+    main()
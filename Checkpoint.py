@@ -0,0 +1,58 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used to store the optimisation result of every terminal,
+#   BLEL and delta_t on disk as soon as it is available. The results are keyed
+#   by a hash of the power profile, the TRU costs and the parameter set, so an 
+#   interrupted sweep can be resumed and only configurations with changed 
+#   inputs are recomputed.
+# -------------
+# Input: 
+#   directory, time, Demand, C_tru, C_tru_z, params
+# ------------
+# Output: 
+#   cached results (one json file per key)
+# ------------
+
+# %% Import libraries
+import hashlib
+import json
+import numbers
+import os
+from dataclasses import astuple
+import numpy as np
+
+# Hash of all inputs of the optimisation of one terminal (and the warm start)
+def key(time, Demand, C_tru, C_tru_z, params, initials=None):
+    values = (C_tru, C_tru_z) + astuple(params)
+    if initials is not None:
+        values += tuple(initials)
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(time, dtype=float).tobytes())
+    h.update(np.ascontiguousarray(Demand, dtype=float).tobytes())
+    h.update(repr([_plain(v) for v in values]).encode())
+    return h.hexdigest()
+
+# Numbers as float, so numpy and python numbers result in the same hash
+def _plain(value):
+    return float(value) if isinstance(value, numbers.Real) else value
+
+# Load a cached result, None if it does not exist
+def load(directory, key):
+    try:
+        with open(os.path.join(directory, key + '.json')) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+# Save a result (written to a temporary file first, so it is never incomplete)
+def save(directory, key, result):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, key + '.json')
+    with open(path + '.%d.tmp' % os.getpid(), 'w') as file:
+        json.dump({k: float(v) for k, v in result.items()}, file)
+    os.replace(path + '.%d.tmp' % os.getpid(), path)
@@ -0,0 +1,85 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used for the opt-in instrumentation of the sweep. If 
+#   'instrumentation' is set in config, the time spent in the optimiser, the 
+#   simulation, the aging model and the windowed peak scans is accumulated per
+#   task, together with the number of (infeasible) objective evaluations and the
+#   iterations and convergence status of the optimiser. Without an active 
+#   recording, timers and counters do nothing.
+# -------------
+# Input: 
+#   -
+# ------------
+# Output: 
+#   per-terminal report (Results/profiling.csv)
+# ------------
+
+# %% Import libraries
+import time as timer
+import config as cf
+
+enabled = cf.instrumentation
+_current = None # report of the running task
+
+# %% Timers and counters
+
+class _Timer:
+    __slots__ = ('name', 'start')
+    
+    def __init__(self, name):
+        self.name = 't_' + name
+    
+    def __enter__(self):
+        self.start = timer.perf_counter()
+    
+    def __exit__(self, *exc):
+        if _current is not None:
+            _current[self.name] = _current.get(self.name, 0.0) + timer.perf_counter() - self.start
+
+class _NoTimer:
+    __slots__ = ()
+    
+    def __enter__(self):
+        pass
+    
+    def __exit__(self, *exc):
+        pass
+
+_no_timer = _NoTimer()
+
+# Context manager that adds the elapsed time to the stage 'name'
+def timer_for(name):
+    return _Timer(name) if _current is not None else _no_timer
+
+# Increase the counter 'name' by n
+def count(name, n=1):
+    if _current is not None:
+        _current[name] = _current.get(name, 0) + n
+
+# Record a single value
+def record(name, value):
+    if _current is not None:
+        _current[name] = value
+
+# %% Recording
+
+# Start the recording of a task
+def start(**info):
+    global _current
+    _current = dict(info) if enabled else None
+
+# Stop the recording and return the report (None if not enabled)
+def stop():
+    global _current
+    report, _current = _current, None
+    return report
+
+# Write the reports of all tasks
+def write(reports, path):
+    import pandas as pd
+    pd.DataFrame(reports).to_csv(path, index=False)
@@ -0,0 +1,140 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script contains compiled kernels for the block-wise prescient 
+#   algorithm, the battery throughput of the linear aging model and the cycle
+#   counting of the rainflow aging model. The kernels
+#   are compiled with numba if it is installed and 'use_numba' is set in config,
+#   otherwise 'enabled' is False and the numpy implementations are used.
+#   The kernels use the block statistics from 'Profiles' and the same order of
+#   operations as the numpy implementation, so the results are identical.
+# -------------
+# Input: 
+#   block statistics, lim, size, parameters / Battery, time
+# ------------
+# Output: 
+#   Battery, soc (per block) / throughput / full equivalent cycles
+# ------------
+
+# %% Import libraries
+import config as cf
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+enabled = numba is not None and cf.use_numba
+
+# %% Kernels
+
+# Block-wise prescient algorithm, soc recurrence with sequential cumsum
+def _prescient(lim, size, blocks, dur, mean_Demand, n_charging, per_hour,
+               soc_max, soc_min, Crate_max, Crate_min, eta):
+    max_char_pow = size * Crate_max #in kW
+    max_dischar_pow = size * Crate_min# in kW
+    
+    Battery = np.zeros(blocks.shape) #power from and to battery in kW
+    soc = np.empty(blocks.shape) #soc
+    soc_prev = soc_max
+    for b in range(blocks.shape[0]):
+        d = dur[b]
+        mean = mean_Demand[b]
+        if mean>lim and soc_prev>soc_min: #Discharge battery
+            myeta = 1/eta
+            P_requested = (lim - mean) * d / n_charging[b] # Requested peak shaving power
+            P_soc_max = (soc_min-soc_prev)*size/(d/per_hour)*eta # Maximum power without violating min. SOC limit
+            Pbat = max(P_requested, max_dischar_pow, P_soc_max) # Allowed battery power
+            for k in range(blocks.shape[1]):
+                Battery[b,k] = max(-blocks[b,k], Pbat) #Prevent feeding energy back into the grid
+        elif mean < lim and soc_prev<soc_max:
+            myeta = eta
+            P_allowed = lim - mean # Allowed charging power
+            P_soc_max = (soc_max-soc_prev)*size/(d/per_hour)/eta # Allowed charging power without violating max. SOC limit
+            Pbat = min(P_allowed, max_char_pow, P_soc_max) #Allowed battery power
+            for k in range(blocks.shape[1]):
+                Battery[b,k] = Pbat
+        else:
+            for k in range(blocks.shape[1]):
+                soc[b,k] = soc_prev
+            continue
+        
+        cumsum = 0.0
+        for k in range(blocks.shape[1]):
+            cumsum += Battery[b,k]/per_hour/size
+            soc[b,k] = soc_prev + myeta*cumsum
+        soc_prev = soc[b,d-1]
+    
+    return Battery, soc
+
+# Integral of the absolute battery power (trapezoidal rule) in kWs
+def _throughput(Battery, time):
+    throughput = 0.0
+    for i in range(len(Battery)-1):
+        throughput += (abs(Battery[i])+abs(Battery[i+1]))*(time[i+1]-time[i])/2
+    return throughput
+
+# Rainflow counting of a soc curve in one pass. Reversals are pushed on a stack
+# and closed cycles are removed from it (three point rule, ASTM E1049), the 
+# remaining reversals are counted as half cycles. Every cycle is weighted with
+# the DoD stress depth**k_dod and the SOC stress exp(k_soc*(mean-soc_ref)).
+def _rainflow(soc, soc_start, k_dod, k_soc, soc_ref):
+    stack = np.empty(len(soc)+2) # reversals
+    stack[0] = soc_start
+    top = 1
+    last = soc_start # current extremum
+    direction = 0.0
+    FEC = 0.0
+    for i in range(len(soc)+1):
+        if i < len(soc):
+            step = soc[i] - last
+            if step == 0 or step*direction > 0: # same direction, extend the extremum
+                last = soc[i]
+                continue
+            if direction == 0: # first change of the soc
+                direction = step
+                last = soc[i]
+                continue
+            direction = step
+        elif direction == 0:
+            break
+        
+        # Push the reversal and count the closed cycles
+        stack[top] = last
+        top += 1
+        if i < len(soc):
+            last = soc[i]
+        while top >= 3:
+            X = abs(stack[top-1]-stack[top-2])
+            Y = abs(stack[top-2]-stack[top-3])
+            if X < Y:
+                break
+            stress = Y**k_dod*np.exp(k_soc*((stack[top-2]+stack[top-3])/2-soc_ref))
+            if top == 3: # range contains the start, half cycle
+                FEC += 0.5*stress
+                stack[0] = stack[1]
+                stack[1] = stack[2]
+                top = 2
+            else: # full cycle
+                FEC += stress
+                stack[top-3] = stack[top-1]
+                top -= 2
+    
+    # Residual half cycles
+    for k in range(top-1):
+        FEC += 0.5*abs(stack[k+1]-stack[k])**k_dod*np.exp(k_soc*((stack[k+1]+stack[k])/2-soc_ref))
+    return FEC
+
+if enabled:
+    prescient = numba.njit(cache=True)(_prescient)
+    throughput = numba.njit(cache=True)(_throughput)
+    rainflow = numba.njit(cache=True)(_rainflow)
+else:
+    prescient = _prescient
+    throughput = _throughput
+    rainflow = _rainflow
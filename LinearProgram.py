@@ -0,0 +1,152 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used to formulate the sizing and dispatch of the SES as a 
+#   sparse linear program that is solved with scipy.optimize.linprog (HiGHS).
+#   The battery power is constant per 15 minute block for charging and 
+#   proportional to the demand for discharging, so the grid power never becomes
+#   negative. The LP includes the SOC dynamics with efficiency, the SOC and 
+#   C-rate limits, full recharge at the end of the profile, the demand charge 
+#   windows of delta_t (multiple of 15 minutes) and the TRU power.
+#   'optimise': size, limit and dispatch with minimal total costs. The battery
+#   annuity depends on the lifetime, which depends on the dispatch, therefore 
+#   the LP is solved repeatedly with the lifetime of the previous solution.
+#   'dispatch': dispatch for a given limit and size with minimal grid costs.
+# -------------
+# Input: 
+#   time, Demand, C_tru, params / lim, size, time, Demand, params
+# ------------
+# Output: 
+#   OptimizeResult (x = [opt_lim, opt_size]) / Battery, Grid, soc
+# ------------
+
+# %% Import libraries
+import numpy as np
+from scipy import sparse
+from scipy.optimize import OptimizeResult, linprog
+
+import AgingModels
+import Profiles
+
+# %% Linear program
+
+def _solve(profile, params, q_bat, tru=True, lim=None, size=None):
+    nb = len(profile.dur)
+    dur = profile.dur.astype(float)
+    mean = profile.mean_Demand
+    peak = np.max(profile.blocks,axis=1)
+    h = dur/profile.per_hour # block duration in hours
+    blk = np.arange(nb)
+    
+    # Variables: charging power c, discharging power d, stored energy e per block,
+    # size E, peak demand P, peak demand above the limit X, TRU power G
+    c, d, e = blk, nb+blk, 2*nb+blk
+    E, P, X, G = 3*nb, 3*nb+1, 3*nb+2, 3*nb+3
+    n = 3*nb+4
+    
+    # SOC dynamics, starting and ending at soc_max
+    rows = np.concatenate([blk, blk, blk, blk[1:], [0, nb, nb]])
+    cols = np.concatenate([e, c, d, e[:-1], [E, e[-1], E]])
+    vals = np.concatenate([np.ones(nb), -params.eta*h, h/params.eta, -np.ones(nb-1), 
+                           [-params.soc_max, 1.0, -params.soc_max]])
+    A_eq = sparse.csr_matrix((vals,(rows,cols)), shape=(nb+1,n))
+    b_eq = np.zeros(nb+1)
+    
+    # SOC and C-rate limits
+    rows = np.concatenate([blk, blk, nb+blk, nb+blk, 2*nb+blk, 2*nb+blk, 3*nb+blk, 3*nb+blk])
+    cols = np.concatenate([e, np.full(nb,E), e, np.full(nb,E), c, np.full(nb,E), d, np.full(nb,E)])
+    vals = np.concatenate([np.ones(nb), np.full(nb,-params.soc_max), -np.ones(nb), np.full(nb,params.soc_min),
+                           np.ones(nb), np.full(nb,-params.Crate_max), np.ones(nb), np.full(nb,params.Crate_min)])
+    b_ub = [np.zeros(4*nb)]
+    
+    # Demand charge windows (mean grid power per window below the peak demand)
+    w = blk//(profile.window//profile.block)
+    length = np.bincount(w, weights=dur)
+    nw = w[-1]+1
+    rows = np.concatenate([rows, 4*nb+w, 4*nb+w, 4*nb+np.arange(nw)])
+    cols = np.concatenate([cols, c, d, np.full(nw,P)])
+    vals = np.concatenate([vals, dur/length[w], -dur/length[w], -np.ones(nw)])
+    b_ub.append(-np.bincount(w, weights=dur*mean)/length)
+    
+    # TRU power (maximum grid power per block below G)
+    ratio = np.divide(peak, mean, out=np.zeros(nb), where=mean>0)
+    rows = np.concatenate([rows, 4*nb+nw+blk, 4*nb+nw+blk, 4*nb+nw+blk])
+    cols = np.concatenate([cols, c, d, np.full(nb,G)])
+    vals = np.concatenate([vals, np.ones(nb), -ratio, -np.ones(nb)])
+    b_ub.append(-peak)
+    
+    # Peak demand above the given limit
+    if lim is not None:
+        rows = np.concatenate([rows, [5*nb+nw, 5*nb+nw]])
+        cols = np.concatenate([cols, [P, X]])
+        vals = np.concatenate([vals, [1.0, -1.0]])
+        b_ub.append([lim])
+    b_ub = np.concatenate(b_ub)
+    A_ub = sparse.csr_matrix((vals,(rows,cols)), shape=(len(b_ub),n))
+    
+    # Costs
+    cost = np.zeros(n)
+    eps = 1e-6 # small throughput penalty to avoid simultaneous charging and discharging
+    cost[c] = params.c_energy*profile.energy_factor*dur + eps
+    cost[d] = -params.c_energy*profile.energy_factor*dur + eps
+    cost[P] = 12*params.c_dem_contr
+    cost[X] = 12*(params.c_dem_uncontr-params.c_dem_contr)
+    if size is None:
+        cost[E] = params.c_bat*q_bat + abs(params.Crate_min)*params.c_dcdc*Profiles.annuity(params.r, params.t_eol_dcdc)
+    if tru:
+        cost[G] = params.c_tru*Profiles.annuity(params.r, params.t_eol_tru)
+    
+    bounds = [(0,None)]*nb + [(0,m) for m in mean] + [(0,None)]*nb + \
+             [(size,size) if size is not None else (0,None), (0,None), 
+              (0,None) if lim is not None else (0,0), (0,None)]
+    res = linprog(cost, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, 
+                  bounds=bounds, method='highs')
+    if res.status != 0:
+        raise RuntimeError('LP could not be solved: ' + res.message)
+    return res.x[c], res.x[d], res.x[e], res.x[E], res.x[P], res
+
+# Power curves at the resolution of the profile from the block solution
+def _curves(profile, charge, discharge, energy, size, Demand, params):
+    blocks = profile.blocks
+    ratio = np.divide(blocks, profile.mean_Demand[:,None], out=np.zeros(blocks.shape), 
+                      where=profile.mean_Demand[:,None]>0)
+    Pdis = discharge[:,None]*ratio # discharge power proportional to the demand
+    Battery = (charge[:,None] - Pdis).ravel()[:len(Demand)]
+    start = np.append(params.soc_max*size, energy[:-1])
+    stored = start[:,None] + np.cumsum(params.eta*charge[:,None] - Pdis/params.eta, axis=1)/profile.per_hour
+    soc = (stored/size if size > 0 else np.full(blocks.shape, params.soc_max)).ravel()[:len(Demand)]
+    Grid = Demand + Battery
+    return Battery, Grid, soc
+
+# %% Sizing and dispatch
+
+def optimise(time, Demand, C_tru, params, maxiter=10):
+    profile = Profiles.get(time, Demand, params)
+    if profile.window % profile.block:
+        raise ValueError('delta_t has to be a multiple of 15 minutes for the LP')
+    
+    # Iterate the battery annuity with the lifetime of the previous solution
+    t_eol_bat = params.tmax/365
+    for nit in range(1, maxiter+1):
+        q_bat = (params.r*(1+params.r)**t_eol_bat)/((1+params.r)**t_eol_bat-1)
+        charge, discharge, energy, size, lim, res = _solve(profile, params, q_bat, tru=not(C_tru))
+        if size <= 0:
+            break
+        Battery, _, soc = _curves(profile, charge, discharge, energy, size, Demand, params)
+        t_eol_new = getattr(AgingModels, params.agingmodel)(time, Battery, soc, size, params)
+        if abs(t_eol_new - t_eol_bat) < 1e-3:
+            break
+        t_eol_bat = t_eol_new
+    
+    return OptimizeResult(x=np.array([lim, size]), fun=res.fun, success=True, nit=nit, nfev=nit)
+
+def dispatch(lim, size, time, Demand, params):
+    profile = Profiles.get(time, Demand, params)
+    if profile.window % profile.block:
+        raise ValueError('delta_t has to be a multiple of 15 minutes for the LP')
+    charge, discharge, energy, size, _, _ = _solve(profile, params, 0, tru=False, lim=lim, size=size)
+    return _curves(profile, charge, discharge, energy, size, Demand, params)
@@ -26,187 +26,139 @@
 #   Input data (pickle files) with power profiles gernerated in CityMoS (Input/PowerProfile)
 # ------------
 # Output: 
-#   Optimal parameters and costs for SES at every terminal and scenario (Results/results.csv)
+#   Optimal parameters and costs for SES at every terminal and scenario (Results/results.csv,
+#   Results/results/delta_t=*/BLEL=*/results.parquet)
 #   Plots of the results
 # ------------
 
 # %% Import libraries and functions
 
 # Import libraries
-import numpy as np
-import pickle
-import pandas as pd
-from scipy.optimize import minimize
+from scipy import stats
 
 # import self defined functions
 import Objective
+import Online
+import PlotExport
+import Parameters
+import ProfileStore
+import ResultStore
+import Scenarios
+import Sensitivity
+import Sweep
 import config as cf
+import Instrumentation
 import MyPlots
 
 # %% Import input data
 
-Powerprofile = pickle.load(open('Input/PowerProfile','rb'))
+# The pickled profiles are converted to a memory-mapped store on first use
+Powerprofile = ProfileStore.load('Input/PowerProfile', cf.profile_store, 
+                                 cf.profile_dtype, cf.profile_aggregate)
 
 # %% Find optimal size and limit for all terminals
 
-df = pd.DataFrame(columns = ['terminal','BLEL','delta_t','n_chargers','opt_lim','opt_size','C_tot','C_dem','C_energy','C_bat','C_tru','C_dcdc','t_eol_bat','C_tot_z','C_dem_z','C_energy_z','C_tru_z'])
-
-# Execute for two different peak power averaging periods
-for t in [15,30]: 
-    cf.delta_t = t
-    # Execute for different BLEL, starting with the highest electrification level
-    for BLEL in sorted(Powerprofile.keys(),reverse=True): 
-        # Execute for all terminals
-        for ter in Powerprofile[BLEL].keys(): 
-            print (BLEL, ter) # Status update
-            
-            # Load data
-            time = Powerprofile[BLEL][ter]['time']
-            Demand = Powerprofile[BLEL][ter]['Demand']
-            
-            # Calculate time averaged peak power without SES
-            Peakdemand_z = max([
-                np.mean(Demand[n:n+cf.delta_t*6]) 
-                for n in range(0,len(Demand),cf.delta_t*6)
-                ]) 
-            
-            # Lookup TRU cost, unless the current BLEL is the highest BLEL
-            if BLEL == sorted(Powerprofile.keys(),reverse=True)[0]:
-                C_tru = []
-                C_tru_z = []
-            else:
-                C_tru = float(df[
-                    (df['BLEL']=='BLEL100')&
-                    (df['terminal']==ter)&
-                    (df['delta_t']==cf.delta_t)
-                    ]['C_tru'])
-                C_tru_z = float(df[
-                    (df['BLEL']=='BLEL100')&
-                    (df['terminal']==ter)&
-                    (df['delta_t']==cf.delta_t)
-                    ]['C_tru_z'])
-            
-            # Determine initialisation point for the optimisation
-            Ebat_initial = 300 # Initial battery size in kWh, selected based on experience
-            Plim_initial = 0.95*Peakdemand_z # Initial peak shaving power in kW, selected based on experience
-            initials = [Plim_initial, Ebat_initial] # Initial values for optimization
-            
-            # Optimisation
-            res = minimize(Objective.function, initials,                     
-                          args = (time, Demand, C_tru, 'opt'),
-                          method= 'Nelder-Mead', 
-                          options={'xatol': 1, 'fatol':0.01, 'maxiter': 300})
-            
-            # Optimisation results
-            opt_size = res.x[1] # Optimal battery size
-            opt_lim = res.x[0] # Optimal peak shaving power
-            
-            # Calculate all cost components with SES
-            C_tot,C_dem,C_energy,C_bat,C_tru,C_dcdc,t_eol_bat,Battery,Grid,soc= \
-                 Objective.function([opt_lim,opt_size], time, Demand, C_tru,'full')
-            
-            # Calculate all cost components without SES
-            C_tot_z,C_dem_z,C_energy_z,_,C_tru_z,_,_,_,_,_= \
-                 Objective.function([Peakdemand_z,0], time, Demand, C_tru_z,'full')
-            
-            # Calculate cost reduction factor (CRF)
-            CRF = 100*(C_tot_z - C_tot)/C_tot_z                 
-            
-            # append results to dataframe
-            df = df.append({'terminal':ter,
-                            'BLEL':BLEL,
-                            'delta_t':t,
-                            'n_chargers':Powerprofile[BLEL][ter]['Nchargers'],
-                            'opt_lim':opt_lim,
-                            'opt_size':opt_size,
-                            'C_tot':C_tot,
-                            'C_dem':C_dem,
-                            'C_energy':C_energy,
-                            'C_bat':C_bat,
-                            'C_tru': C_tru,
-                            'C_dcdc':C_dcdc,
-                            't_eol_bat':t_eol_bat,                            
-                            'C_tot_z':C_tot_z,
-                            'C_dem_z':C_dem_z,
-                            'C_energy_z':C_energy_z,
-                            'C_tru_z':C_tru_z,
-                            'CRF': CRF,
-                            },ignore_index=True)
-
-#Calculate share of demand charges
-df['share_of_demand'] = df['C_dem']/df['C_tot']
-df['share_of_demand_z'] = df['C_dem_z']/df['C_tot_z']
-df = df.sort_values('BLEL')
-
-# Save data as .csv-file
-df.to_csv('Results/results.csv')
+# Execute for two different peak power averaging periods and all BLELs and terminals
+results = Sweep.run(Powerprofile, delta_ts=[15,30], n_workers=cf.n_workers, 
+                    params=Parameters.default(), cache=cf.cache_dir)
+
+# Result table and files (timed as an additional row of the profiling report)
+Instrumentation.start(stage='results')
+with Instrumentation.timer_for('frame'):
+    df = results.frame()
+    
+    #Calculate share of demand charges
+    df['share_of_demand'] = df['C_dem']/df['C_tot']
+    df['share_of_demand_z'] = df['C_dem_z']/df['C_tot_z']
+    df = df.sort_values('BLEL')
+
+# Save data as typed files partitioned by delta_t and BLEL and as .csv-file
+with Instrumentation.timer_for('write'):
+    if cf.result_format:
+        ResultStore.write(df, 'Results/results', cf.result_format)
+    if cf.result_csv:
+        df.to_csv('Results/results.csv')
+report = Instrumentation.stop()
+if results.profiling:
+    Instrumentation.write(results.profiling + [report], 'Results/profiling.csv')
 
 # Load default results for plots
-#df = pd.read_csv('Results/results_default.csv')
+#df = ResultStore.read('Results/results') # or pandas.read_csv('Results/results_default.csv')
+#results = ResultStore.from_frame(df)
 
-# Generate result plots
-MyPlots.result_plots(df)
+# Generate result plots (interactive or as files together with the power curves of all terminals)
+if cf.plot_export:
+    PlotExport.run(Powerprofile, results, 'Results/plots', delta_t=30, df=df, n_workers=cf.n_workers)
+else:
+    MyPlots.result_plots(df)
 
 # %% Single Terminal
 
 # Define parameters
 BLEL = 'BLEL050' #'BLEL030','BLEL050','BLEL070','BLEL080','BLEL090','BLEL100'
 ter = 'ter_16009' #Terminal ID. See list(Powerprofile[BLEL].keys())
-cf.delta_t = 30 #Peak power averaging period in minutes
+params = Parameters.default(delta_t=30) #Peak power averaging period in minutes
 
 # Load data
 time = Powerprofile[BLEL][ter]['time']
 Demand = Powerprofile[BLEL][ter]['Demand']
 
 # Lookup optimal configuration
-opt_size = float(df[
-    (df['BLEL']==BLEL)&
-    (df['terminal']==ter)&
-    (df['delta_t']==cf.delta_t)
-    ]['opt_size'])
-opt_lim = float(df[
-    (df['BLEL']==BLEL)&
-    (df['terminal']==ter)&
-    (df['delta_t']==cf.delta_t)
-    ]['opt_lim'])
+opt_size = results.get(BLEL, ter, params.delta_t)['opt_size']
+opt_lim = results.get(BLEL, ter, params.delta_t)['opt_lim']
 
 # Recalculate power curves
 _,_,_,_,_,_,_,Battery,Grid,soc= \
-     Objective.function([opt_lim,opt_size], time, Demand, [],'full')
+     Objective.function([opt_lim,opt_size], time, Demand, [],'full', params)
 
 # Generate power curve plot
-MyPlots.power_curves_plot(Demand,Grid,Battery,soc,time,opt_lim,opt_size)
+MyPlots.power_curves_plot(Demand,Grid,Battery,soc,time,opt_lim,opt_size,params)
+
+# Compare the online controllers (with and without lookahead) with the batch result
+if cf.online_replay:
+    print(Online.replay(Powerprofile, BLEL, ter, opt_lim, opt_size, params.delta_t, params=params))
 
 # %% Parameter sensitivity analysis for single terminal
 
 # Generate points for contourplot
-Peakdemand_z = max([
-                np.mean(Demand[n:n+cf.delta_t*6]) 
-                for n in range(0,len(Demand),cf.delta_t*6)
-                ]) 
-
-lim = np.append(opt_lim, np.linspace(np.mean(Demand),Peakdemand_z,50))
-lim.sort()
-size = np.append(opt_size, np.linspace(0,400,50))
-size.sort()
-
-# Calculate costs for contour plots
-C_tot = np.zeros((len(lim),len(size)))
-C_dem = np.zeros((len(lim),len(size)))
-C_energy = np.zeros((len(lim),len(size)))
-C_bat = np.zeros((len(lim),len(size)))
-Peakdemand = np.zeros((len(lim),len(size)))
-for i in range(0,len(lim)):
-    for j in range(0,len(size)):
-        C_tot[i,j], C_dem[i,j], C_energy[i,j], C_bat[i,j],_,_,_,_,Grid,_=\
-            Objective.function([lim[i], size[j]], time, Demand, [], 'full')
-        Peakdemand[i,j] = max([np.mean(Grid[n:n+cf.delta_t*6]) for n in range(0,len(Grid),cf.delta_t*6)])
+lim, size = Sensitivity.axes(time, Demand, params, opt_lim, opt_size)
+
+# Calculate costs for contour plots (all grid points or adaptively refined)
+if cf.sensitivity == 'adaptive':
+    C_tot, C_dem, C_energy, C_bat, Peakdemand, evaluated = \
+        Sensitivity.adaptive(lim, size, time, Demand, [], params, tol=cf.sensitivity_tol)
+else:
+    C_tot, C_dem, C_energy, C_bat, Peakdemand, evaluated = \
+        Sensitivity.full(lim, size, time, Demand, [], params)
 
 # Calculate line at which peak shaving limit is exceeded
-lim_exceeded = np.zeros(len(size))            
-for j in range(0,len(size)):
-     lim_exceeded[j] = next(lim[i] for i, P in enumerate(Peakdemand[:,j]) if 0.99*P<lim[i])
+lim_exceeded = Sensitivity.limit_exceeded(lim, Peakdemand)
 
 # Generate contour plot
 MyPlots.contour_plots(size,lim,opt_size,opt_lim,
                       C_dem,C_energy,C_bat,C_tot,lim_exceeded)
+
+# %% Parameter sensitivity analysis for all terminals
+
+# Calculate the surfaces of all terminals and BLELs and store them
+if cf.sensitivity_all:
+    Sensitivity.run(Powerprofile, 'Results/sensitivity.npz', delta_t=30, results=results, 
+                    n_workers=cf.n_workers, params=Parameters.default(), 
+                    method=cf.sensitivity, tol=cf.sensitivity_tol)
+
+# Generate contour plot from the stored surfaces
+#MyPlots.contour_plots(**Sensitivity.surface(Sensitivity.load('Results/sensitivity.npz'), BLEL, ter))
+
+# %% Cost scenarios for all terminals
+
+# Monte Carlo samples of the cost parameters (+-30% battery costs, +-20% demand 
+# charges, interest rate between 3% and 7%)
+if cf.scenario_samples:
+    params = Parameters.default()
+    samples = Scenarios.monte_carlo(cf.scenario_samples, seed=0,
+                                    c_bat=stats.uniform(0.7*params.c_bat, 0.6*params.c_bat),
+                                    c_dem_contr=stats.uniform(0.8*params.c_dem_contr, 0.4*params.c_dem_contr),
+                                    r=stats.uniform(0.03, 0.04))
+    df_scenarios = Scenarios.run(Powerprofile, samples, delta_t=30, n_workers=cf.n_workers, params=params)
+    df_scenarios.to_csv('Results/scenarios.csv')
+    Scenarios.quantiles(df_scenarios).to_csv('Results/scenario_quantiles.csv')
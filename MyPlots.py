@@ -20,41 +20,58 @@
 # %% Import libraries
 
 import matplotlib.pyplot as plt
-import seaborn as sn
 import numpy as np
 import pandas as pd
-import config as cf
+import Parameters
+import Profiles
+import Windows
 
 # %% Power curve plot
 
-def power_curves_plot(Demand,Grid,Battery,SOC,time,opt_lim,opt_size):
+def power_curves_plot(Demand,Grid,Battery,SOC,time,opt_lim,opt_size,params=None,xlim=(4,123),columns=None,fig=None):
+    if params is None:
+        params = Parameters.default()
+    
+    if fig is None:
+        fig = plt.figure(constrained_layout=True, figsize=(16,9))
+    (ax1, ax2, ax3) = fig.subplots(3, 1, sharex='all', gridspec_kw={'height_ratios': [3, 3, 2]})
+    
+    profile = Profiles.get(time, Demand, params)
+    Peakdemand1 = profile.Demand_windows
+    Peakdemand2 = Windows.means(Grid, profile.window)
+    time_peak = np.asarray(time)[::profile.window]/3600
+    
+    # Keep the minimum and maximum of every pixel column of the visible range
+    time = np.asarray(time)
+    def curve(X):
+        if columns is None:
+            return time/3600, X
+        i0, i1 = (0, len(time)) if xlim is None else np.searchsorted(time/3600, xlim)
+        i0, i1 = max(i0-1, 0), i1+1 # samples next to the visible range
+        t, X = Windows.minmax(time[i0:i1], np.asarray(X)[i0:i1], columns)
+        return t/3600, X
     
-    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, constrained_layout=True, sharex='all', figsize=(16,9), gridspec_kw={'height_ratios': [3, 3, 2]})
-    
-    Peakdemand1 = [np.mean(Demand[n:n+cf.delta_t*6]) for n in range(0,len(Demand),cf.delta_t*6)]
-    Peakdemand2 = [np.mean(Grid[n:n+cf.delta_t*6]) for n in range(0,len(Grid),cf.delta_t*6)]
-    
-    time_peak = [time[n]/3600 for n in range(0,len(Grid),cf.delta_t*6)]
     ax1.grid(color='gray', linestyle='-', linewidth=1)
-    ax1.plot(time/3600, Demand, color = [0/255, 101/255, 189/255], linewidth=1) 
+    ax1.plot(*curve(Demand), color = [0/255, 101/255, 189/255], linewidth=1) 
     ax1.plot(time_peak, Peakdemand1, '-', color = 'red', linewidth=1)
     ax1.plot([0,time[-1]/3600],[opt_lim, opt_lim], '--',dashes=(5, 2), color = 'forestgreen', linewidth=1)
     
     ax1.legend(['$P_{cs}$','$P_{cs,30}$','$P_{lim}$'],loc='upper right')
     ax1.set_ylabel('Power in kW')
     
-    ax2.plot(time/3600, Grid,color = [231/255, 115/255, 38/255], linewidth=1)
+    ax2.plot(*curve(Grid),color = [231/255, 115/255, 38/255], linewidth=1)
     ax2.plot(time_peak, Peakdemand2, '-', color = 'purple', linewidth=1)
-    ax2.plot(time/3600, Battery, color = 'darkgreen', linewidth=1)
+    ax2.plot(*curve(Battery), color = 'darkgreen', linewidth=1)
     ax2.plot([0,time[-1]/3600],[opt_lim, opt_lim], '--', color = 'forestgreen',dashes=(5, 2), linewidth=1)
     
     ax2.legend(['$P_{grid}$','$P_{grid,30}$','$P_{bat}$','$P_{lim}$'],loc='upper right')
     ax2.set_ylabel('Power in kW')
     ax2.grid(color='gray', linestyle='-', linewidth=1)
     
-    plt.xlim(4,123)
+    if xlim is not None:
+        ax1.set_xlim(*xlim)
    
-    ax3.plot(time/3600, SOC, color = 'black', linewidth=1)
+    ax3.plot(*curve(SOC), color = 'black', linewidth=1)
     ax3.set_xlabel('Time in hours')
     ax3.set_ylabel('SOC')
     ax3.grid(color='gray', linestyle='-', linewidth=1)
@@ -62,6 +79,8 @@ def power_curves_plot(Demand,Grid,Battery,SOC,time,opt_lim,opt_size):
     ax3.set_ylim([0,1])
     ax3.legend(['$SOC$'],loc='upper right')
     
+    return fig
+    
 # %% Contour plot
     
 def contour_plots(size,lim,opt_size,opt_lim,C_dem,C_energy,C_bat,C_tot,lim_exceeded):
@@ -127,6 +146,7 @@ def contour_plots(size,lim,opt_size,opt_lim,C_dem,C_energy,C_bat,C_tot,lim_excee
 # %% Result plot for all terminals
     
 def result_plots(df):
+    import seaborn as sn # only required for the result plots
     
     plot_width = 255*2
     box_plot_len = 170*2
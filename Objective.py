@@ -8,82 +8,285 @@
 # The objective function evaluates the system costs for the given battery size, 
 # peak shaving power and power profile. The costs for the Transformer Rectifier
 # Unit (TRU) from the highest BLEL are used, unless the current configuration is
-# the configuration with the highest BLEL
+# the configuration with the highest BLEL.
+# The simulation of the dispatch and the battery life ('simulate') is separated
+# from the costs ('cost'). The summaries of the simulation are cached, so 
+# cost-only changes (other TRU costs or cost parameters, recalculation of the 
+# cost components) skip the simulation.
+# 'batch' evaluates the costs for many limits and sizes of one power profile at
+# once and returns vectors of the cost components. It is split into the 
+# dispatch ('summaries': grid power per 15 minute block and full equivalent 
+# cycles of the aging model),
+# which only depends on the cell parameters, and the pricing ('price'), so the
+# same dispatch can be priced for several cost scenarios.
 # -------------
 # Input: 
-#   param, time, Demand, C_tru, output
+#   param, time, Demand, C_tru, output, params
 # ------------
 # Output: 
 #   C_tot, C_dem, C_energy, C_bat, C_tru, C_dcdc, t_eol_bat, Battery, Grid, soc
 # ------------
 
 # %% Import libraries
-import config as cf
+from collections import OrderedDict
+import Parameters
 import numpy as np
 import AgingModels
 import Algorithms
+import Instrumentation
+import Profiles
+import Windows
+
+cache_size = 4096 # number of cached dispatch summaries
+_cache = OrderedDict()
+
+# Remove all cached dispatch summaries
+def clear_cache():
+    _cache.clear()
 
 # Objective function
-def function(param, time, Demand, C_tru, output):
+def function(param, time, Demand, C_tru, output, params=None):
+    if params is None:
+        params = Parameters.default()
     
     lim = param[0]
     size = param[1]
     
+    if output == 'opt':
+        return(cost(lim, size, simulate(lim, size, time, Demand, params), time, Demand, C_tru, params)[0])
+    elif output == 'full':
+        # Recalculate the power curves, the summary is cached for later evaluations
+        Battery, Grid, soc, t_eol_bat = _dispatch(lim, size, time, Demand, params)
+        summary = _summary(Grid, t_eol_bat, Profiles.get(time, Demand, params))
+        _store(_key(lim, size, time, Demand, params), summary, time, Demand)
+        return(cost(lim, size, summary, time, Demand, C_tru, params) + (Battery, Grid, soc))
+
+# Cost components without power curves
+def costs(param, time, Demand, C_tru, params=None):
+    if params is None:
+        params = Parameters.default()
+    summary = simulate(param[0], param[1], time, Demand, params)
+    return(cost(param[0], param[1], summary, time, Demand, C_tru, params))
+
+# %% Simulation stage
+
+# Summary of the dispatch (t_eol_bat, maximum and sum of the grid power, peak
+# demand power). Only the cell, aging and demand charge window parameters 
+# affect the dispatch, so the summaries are cached independently of the costs
+# (except for 'lp', which minimises the energy and demand charges)
+def simulate(lim, size, time, Demand, params=None):
+    if params is None:
+        params = Parameters.default()
+    key = _key(lim, size, time, Demand, params)
+    cached = _cache.get(key)
+    if cached is not None:
+        _cache.move_to_end(key)
+        Instrumentation.count('simulation_cache_hits')
+        return cached[0]
+    
+    _, Grid, _, t_eol_bat = _dispatch(lim, size, time, Demand, params)
+    summary = _summary(Grid, t_eol_bat, Profiles.get(time, Demand, params))
+    _store(key, summary, time, Demand)
+    return summary
+
+def _key(lim, size, time, Demand, params):
+    return (id(time), id(Demand), float(lim), float(size), params.delta_t, 
+            params.soc_max, params.soc_min, params.Crate_max, params.Crate_min, params.eta,
+            params.EOL, params.tmax, params.nmax, params.T_a, params.k_dod, params.k_soc, params.soc_ref,
+            params.algorithm, params.agingmodel) + \
+           ((params.c_energy, params.c_dem_contr, params.c_dem_uncontr) if params.algorithm == 'lp' else ())
+
+def _store(key, summary, time, Demand):
+    _cache[key] = (summary, time, Demand) # cached arrays stay alive, so ids are unique
+    if len(_cache) > cache_size:
+        _cache.popitem(last=False)
+
+# Battery and grid power, soc and battery life
+def _dispatch(lim, size, time, Demand, params):
+    profile = Profiles.get(time, Demand, params)
+    Instrumentation.count('simulations')
+    
     #Catch unvalid limits and sizes
-    Peakdemand_z = max([
-                np.mean(Demand[n:n+cf.delta_t*6]) 
-                for n in range(0,len(Demand),cf.delta_t*6)
-                ]) 
-    if (lim<0 or lim>Peakdemand_z or size<0):
+    if (lim<0 or lim>profile.Peakdemand_z or size<0):
         Battery = [np.nan]
         Grid = [np.nan]
         soc = [np.nan]
         t_eol_bat = np.nan  
-        C_bat = np.nan
-        C_dcdc = 0.0
     elif size == 0:
         Battery = np.zeros(len(Demand))
         Grid = Demand
-        soc = np.full(len(Demand),cf.soc_max)  
+        soc = np.full(len(Demand),params.soc_max)  
         t_eol_bat = np.nan          
-        C_bat = 0.0      
-        C_dcdc = 0.0
     else:
         # Determine battery and grid power for current limit
-        Battery, Grid, soc = Algorithms.prescient(lim, size, time, Demand)
+        with Instrumentation.timer_for('simulation'):
+            Battery, Grid, soc = getattr(Algorithms, params.algorithm)(lim, size, time, Demand, params)
 
         # Calculate battery life
-        t_eol_bat = AgingModels.linear(time, Battery, soc, size)
-        
+        with Instrumentation.timer_for('aging'):
+            t_eol_bat = getattr(AgingModels, params.agingmodel)(time, Battery, soc, size, params)
+    
+    return(Battery, Grid, soc, t_eol_bat)
+
+def _summary(Grid, t_eol_bat, profile):
+    with Instrumentation.timer_for('peak'):
+        Peakdemand = Windows.peak(Grid, profile.window) #Peak demand power
+    return(t_eol_bat, np.max(Grid), sum(Grid), Peakdemand)
+
+# %% Cost stage
+
+# Costs of a dispatch summary
+def cost(lim, size, summary, time, Demand, C_tru, params=None):
+    if params is None:
+        params = Parameters.default()
+    t_eol_bat, Grid_max, Grid_sum, Peakdemand = summary
+    profile = Profiles.get(time, Demand, params)
+    
+    #Catch unvalid limits and sizes
+    if (lim<0 or lim>profile.Peakdemand_z or size<0):
+        C_bat = np.nan
+        C_dcdc = 0.0
+    elif size == 0:
+        C_bat = 0.0      
+        C_dcdc = 0.0
+    else:
         # Calculate battery cost
-        q_bat = (cf.r*(1+cf.r)**t_eol_bat)/((1+cf.r)**t_eol_bat-1)
-        C_bat = cf.c_bat * size * q_bat
+        q_bat = (params.r*(1+params.r)**t_eol_bat)/((1+params.r)**t_eol_bat-1)
+        C_bat = params.c_bat * size * q_bat
         
         # Calculate dcdc costs
-        q_dcdc = (cf.r*(1+cf.r)**cf.t_eol_dcdc)/((1+cf.r)**cf.t_eol_dcdc-1)
-        C_dcdc = abs(cf.Crate_min) * size * cf.c_dcdc * q_dcdc
+        C_dcdc = abs(params.Crate_min) * size * params.c_dcdc * Profiles.annuity(params.r, params.t_eol_dcdc)
        
     # Calculate TRU costs if no TRU cost is provided
     if not(C_tru):
-        q_tru = (cf.r*(1+cf.r)**cf.t_eol_tru)/((1+cf.r)**cf.t_eol_tru-1)
-        C_tru = max(Grid) * cf.c_tru * q_tru
+        C_tru = Grid_max * params.c_tru * Profiles.annuity(params.r, params.t_eol_tru)
 
     # Calculate peak demand cost
-    Peakdemand = max([
-        np.mean(Grid[n:n+cf.delta_t*6]) 
-        for n in range(0,len(Grid),cf.delta_t*6)]) #Peak demand power
-    C_dem = (cf.c_dem_contr * min(lim,Peakdemand) + 
-             cf.c_dem_uncontr * max(0,Peakdemand-lim)) * 12 #Peak demand cost
+    C_dem = (params.c_dem_contr * min(lim,Peakdemand) + 
+             params.c_dem_uncontr * max(0,Peakdemand-lim)) * 12 #Peak demand cost
     
     # Calculate energy costs
-    n_days = (time[-1]-time[0])/3600/24
-    E_annual = sum(Grid)*10/3600*365/n_days # energy demand
-    C_energy = cf.c_energy * E_annual
+    E_annual = Grid_sum*profile.energy_factor # energy demand
+    C_energy = params.c_energy * E_annual
     
     # Calculate total costs
     C_tot = C_bat + C_dcdc + C_tru + C_energy + C_dem
+    Instrumentation.count('evaluations')
+    if np.isnan(C_tot):
+        Instrumentation.count('nan_evaluations')
     
-    if output == 'opt':
-        return(C_tot)
-    elif output == 'full':
-        return(C_tot, C_dem, C_energy, C_bat, C_tru, C_dcdc, t_eol_bat, Battery, Grid, soc)
\ No newline at end of file
+    return(C_tot, C_dem, C_energy, C_bat, C_tru, C_dcdc, t_eol_bat)
+
+# Batched objective function for arrays of limits and sizes
+def batch(lims, sizes, time, Demand, C_tru, params=None):
+    if params is None:
+        params = Parameters.default()
+    
+    lims = np.asarray(lims, dtype=float)
+    sizes = np.asarray(sizes, dtype=float)
+    
+    # Batched evaluation requires demand charge windows of whole 15 minute blocks
+    # and a block-wise algorithm, otherwise every candidate is simulated
+    profile = Profiles.get(time, Demand, params)
+    if profile.window % profile.block or params.algorithm not in AgingModels.block_algorithms:
+        simulated = [simulate(lim, size, time, Demand, params) for lim, size in zip(lims, sizes)]
+        results = [cost(lim, size, summary, time, Demand, C_tru, params)
+                   for lim, size, summary in zip(lims, sizes, simulated)]
+        Peakdemand = [summary[3] for summary in simulated]
+        return tuple(np.array(c, dtype=float) for c in zip(*results)) + (np.array(Peakdemand),)
+    
+    return price(lims, sizes, summaries(lims, sizes, time, Demand, params), 
+                 time, Demand, C_tru, params)
+
+# Block sums and maxima of the grid power and full equivalent cycles of the
+# aging model ('linear': throughput, 'rainflow': cycles of the soc per block).
+# Algorithms that are not block-wise (e.g. 'lp') are simulated per candidate
+def summaries(lims, sizes, time, Demand, params=None):
+    if params is None:
+        params = Parameters.default()
+    lims = np.asarray(lims, dtype=float)
+    sizes = np.asarray(sizes, dtype=float)
+    
+    #Catch unvalid limits and sizes
+    profile = Profiles.get(time, Demand, params)
+    valid = (lims>=0) & (lims<=profile.Peakdemand_z) & (sizes>=0)
+    sim = valid & (sizes>0)
+    
+    # Determine block sums and maxima of the grid power
+    blocks, dur = profile.blocks, profile.dur
+    Grid_sum = np.full((len(lims),len(dur)), np.nan)
+    Grid_max = np.full((len(lims),len(dur)), np.nan)
+    Grid_sum[valid] = np.sum(blocks,axis=1)
+    Grid_max[valid] = np.max(blocks,axis=1)
+    FEC = np.full(len(lims), np.nan)
+    if any(sim) and params.algorithm not in AgingModels.block_algorithms:
+        padded = np.zeros(blocks.size) # grid power padded to full blocks
+        for k in np.flatnonzero(sim):
+            with Instrumentation.timer_for('simulation'):
+                Battery, Grid, soc = getattr(Algorithms, params.algorithm)(lims[k], sizes[k], time, Demand, params)
+            padded[:len(Demand)] = Grid
+            Grid_sum[k] = np.sum(padded.reshape(blocks.shape),axis=1)
+            Grid_max[k] = np.max(padded.reshape(blocks.shape),axis=1)
+            with Instrumentation.timer_for('aging'):
+                if params.agingmodel == 'rainflow':
+                    FEC[k] = AgingModels.rainflow_fec(soc, params)
+                else:
+                    FEC[k] = AgingModels.throughput(time, Battery)/3600/sizes[k]/2
+    elif any(sim):
+        with Instrumentation.timer_for('batch_simulation'):
+            Grid_sum[sim], Grid_max[sim], throughput, soc_end = \
+                Algorithms.prescient_batch(lims[sim], sizes[sim], time, Demand, params)
+        with Instrumentation.timer_for('aging'):
+            if params.agingmodel == 'rainflow':
+                FEC[sim] = [AgingModels.rainflow_fec(soc, params) for soc in soc_end]
+            else:
+                FEC[sim] = throughput/3600/sizes[sim]/2
+    
+    return(Grid_sum, Grid_max, FEC)
+
+# Costs of the dispatch summaries
+def price(lims, sizes, summaries, time, Demand, C_tru, params=None):
+    if params is None:
+        params = Parameters.default()
+    lims = np.asarray(lims, dtype=float)
+    sizes = np.asarray(sizes, dtype=float)
+    Grid_sum, Grid_max, FEC = summaries
+    
+    profile = Profiles.get(time, Demand, params)
+    dur = profile.dur
+    valid = (lims>=0) & (lims<=profile.Peakdemand_z) & (sizes>=0)
+    sim = valid & (sizes>0)
+    
+    # Calculate battery life
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_eol_bat = AgingModels.linear_fec(FEC, profile.n_days, params)
+    
+        # Calculate battery cost
+        q_bat = (params.r*(1+params.r)**t_eol_bat)/((1+params.r)**t_eol_bat-1)
+    C_bat = np.where(sim, params.c_bat * sizes * q_bat, np.where(valid, 0.0, np.nan))
+    
+    # Calculate dcdc costs
+    C_dcdc = np.where(sim, abs(params.Crate_min) * sizes * params.c_dcdc * Profiles.annuity(params.r, params.t_eol_dcdc), 0.0)
+    
+    # Calculate TRU costs if no TRU cost is provided
+    if not(C_tru):
+        C_tru = np.max(Grid_max,axis=1) * params.c_tru * Profiles.annuity(params.r, params.t_eol_tru)
+    else:
+        C_tru = np.full(len(lims), C_tru)
+    
+    # Calculate peak demand cost
+    m = profile.window//profile.block # blocks per demand charge window
+    Peakdemand = np.max(Windows.sums(Grid_sum, m)/Windows.sums(dur, m),axis=1) #Peak demand power
+    C_dem = (params.c_dem_contr * np.fmin(lims,Peakdemand) + 
+             params.c_dem_uncontr * np.fmax(0,Peakdemand-lims)) * 12 #Peak demand cost
+    
+    # Calculate energy costs
+    E_annual = np.sum(Grid_sum,axis=1)*profile.energy_factor # energy demand
+    C_energy = params.c_energy * E_annual
+    
+    # Calculate total costs
+    C_tot = C_bat + C_dcdc + C_tru + C_energy + C_dem
+    Instrumentation.count('batch_evaluations', len(lims))
+    Instrumentation.count('nan_evaluations', int(np.sum(np.isnan(C_tot))))
+    
+    return(C_tot, C_dem, C_energy, C_bat, C_tru, C_dcdc, t_eol_bat, Peakdemand)
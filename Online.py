@@ -0,0 +1,194 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description:
+#   This script is used to run the SES dispatch online. 'Controller' consumes
+#   the demand samples one at a time or in chunks and emits the battery
+#   setpoints. Only the soc, the current 15 minute block and the running demand
+#   charge window of the grid power are kept, the memory does not grow with
+#   the length of the profile.
+#   With lookahead the controller is the prescient algorithm: the samples are
+#   the demand of the next block as known in advance (e.g. from the charging
+#   schedule) and the setpoints of a block are emitted once the whole block
+#   has been received (latency of one block). The setpoints are identical to
+#   'Algorithms.prescient'.
+#   Without lookahead the setpoint of every sample is emitted immediately. The
+#   block mean is not known in advance, therefore the battery discharges
+#   whenever the demand exceeds the limit plus the unused part of the limit in
+#   the current demand charge window and charges with the remaining power below
+#   the limit. The end-of-profile check for a full battery is not applied.
+#   'replay' streams a stored power profile through both controllers and
+#   compares the peak demand and costs with the batch 'Objective.function'.
+# -------------
+# Input:
+#   lim, size, dt, params, Demand samples
+# ------------
+# Output:
+#   Battery setpoints, soc
+# ------------
+
+# %% Import libraries
+from dataclasses import replace
+import numpy as np
+import pandas as pd
+
+import AgingModels
+import Objective
+import Parameters
+import Profiles
+import Windows
+
+# %% Controller
+
+class Controller:
+
+    def __init__(self, lim, size, dt=10, params=None, lookahead=False):
+        if params is None:
+            params = Parameters.default()
+        self.lim = float(lim)
+        self.size = float(size)
+        self.params = params
+        self.lookahead = lookahead
+        self.per_hour = 3600/dt # samples per hour
+        self.soc = params.soc_max # soc after the last emitted setpoint
+        self.peak = Windows.StreamingPeak(Profiles.samples(params.delta_t*60, dt)) # grid power
+        self.buffer = np.empty(Profiles.samples(Profiles.block_duration, dt)) # demand of the current block
+        self.count = 0 # samples in the buffer
+
+    # Add one sample or an array of samples, returns the emitted setpoints and soc
+    def update(self, Demand):
+        Demand = np.atleast_1d(np.asarray(Demand, dtype=float))
+        if not self.lookahead:
+            return self._causal(Demand)
+
+        Battery, soc = [], []
+        while len(Demand):
+            k = min(len(self.buffer)-self.count, len(Demand))
+            self.buffer[self.count:self.count+k] = Demand[:k]
+            self.count += k
+            Demand = Demand[k:]
+            if self.count == len(self.buffer):
+                Battery_block, soc_block = self._block(self.buffer)
+                Battery.append(Battery_block)
+                soc.append(soc_block)
+                self.count = 0
+        if not Battery:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(Battery), np.concatenate(soc)
+
+    # Emit the setpoints of an incomplete last block (end of the profile)
+    def flush(self):
+        if not self.lookahead or self.count == 0:
+            return np.empty(0), np.empty(0)
+        Battery, soc = self._block(self.buffer[:self.count])
+        self.count = 0
+        return Battery, soc
+
+    # Prescient algorithm for one block
+    def _block(self, period_Demand):
+        params, lim, size, h = self.params, self.lim, self.size, self.per_hour
+        dur = len(period_Demand)
+        mean_Demand = np.mean(period_Demand)
+        Battery = np.zeros(dur)
+
+        if size <= 0:
+            myeta = 0
+        elif mean_Demand>lim and self.soc>params.soc_min: #Discharge battery
+            myeta = 1/params.eta
+            P_requested = (lim - mean_Demand) * dur / np.count_nonzero(period_Demand>0) # Requested peak shaving power
+            P_soc_max = (params.soc_min-self.soc)*size/(dur/h)*params.eta # Maximum power without violating min. SOC limit
+            Pbat = max(P_requested, size*params.Crate_min, P_soc_max) # Allowed battery power
+            Battery = np.maximum(-period_Demand, np.full(dur, Pbat)) #Prevent feeding energy back into the grid
+        elif mean_Demand < lim and self.soc<params.soc_max:
+            myeta = params.eta
+            P_allowed = lim - mean_Demand # Allowed charging power
+            P_soc_max = (params.soc_max-self.soc)*size/(dur/h)/params.eta # Allowed charging power without violating max. SOC limit
+            Pbat = min(P_allowed, size*params.Crate_max, P_soc_max) #Allowed battery power
+            Battery = np.full(dur, Pbat)
+        else: myeta = 0
+
+        soc = self.soc + myeta*np.cumsum(Battery/h/size) if myeta else np.full(dur, self.soc)
+        self.soc = soc[-1]
+        self.peak.update(period_Demand + Battery)
+        return Battery, soc
+
+    # Causal dispatch sample by sample
+    def _causal(self, Demand):
+        params, lim, size, h = self.params, self.lim, self.size, self.per_hour
+        Battery = np.zeros(len(Demand))
+        soc = np.empty(len(Demand))
+
+        for k, D in enumerate(Demand.tolist()):
+            # Grid power that keeps the mean of the current window below the limit
+            G_allowed = lim + lim*self.peak.count - self.peak.sum
+            if size <= 0:
+                Pbat = 0.0
+            elif D > G_allowed and self.soc > params.soc_min: #Discharge battery
+                P_soc_max = (params.soc_min-self.soc)*size*h*params.eta # Maximum power without violating min. SOC limit
+                Pbat = max(G_allowed - D, size*params.Crate_min, P_soc_max, -D)
+                self.soc += Pbat/h/size/params.eta
+            elif min(lim, G_allowed) > D and self.soc < params.soc_max:
+                P_soc_max = (params.soc_max-self.soc)*size*h/params.eta # Allowed charging power without violating max. SOC limit
+                Pbat = min(min(lim, G_allowed) - D, size*params.Crate_max, P_soc_max)
+                self.soc += Pbat/h/size*params.eta
+            else:
+                Pbat = 0.0
+            Battery[k] = Pbat
+            soc[k] = self.soc
+            self.peak.update(D + Pbat)
+
+        return Battery, soc
+
+# %% Replay of stored profiles
+
+# Stream a profile through a controller in chunks of the given number of samples
+def stream(lim, size, time, Demand, params=None, lookahead=False, chunk=1):
+    if params is None:
+        params = Parameters.default()
+    controller = Controller(lim, size, Profiles.step(time), params, lookahead)
+    Battery, soc = [], []
+    for i in range(0, len(Demand), chunk):
+        Battery_chunk, soc_chunk = controller.update(Demand[i:i+chunk])
+        Battery.append(Battery_chunk)
+        soc.append(soc_chunk)
+    Battery_chunk, soc_chunk = controller.flush()
+    Battery = np.concatenate(Battery + [Battery_chunk])
+    soc = np.concatenate(soc + [soc_chunk])
+    return Battery, Demand + Battery, soc, controller.peak.peak
+
+# Peak demand and costs of the batch optimisation and both controllers for one
+# terminal (default: optimum of the sweep results)
+def replay(Powerprofile, BLEL, ter, lim=None, size=None, delta_t=30, results=None,
+           params=None, chunk=1):
+    if params is None:
+        params = Parameters.default()
+    params = replace(params, delta_t=delta_t)
+    time = Powerprofile[BLEL][ter]['time']
+    Demand = Powerprofile[BLEL][ter]['Demand']
+    if lim is None or size is None:
+        result = results.get(BLEL, ter, delta_t)
+        lim, size = result['opt_lim'], result['opt_size']
+
+    rows = {}
+    C_tot,C_dem,C_energy,C_bat,_,_,t_eol_bat,Battery_batch,Grid,soc = \
+        Objective.function([lim,size], time, Demand, [], 'full', params)
+    rows['batch'] = dict(Peakdemand=Windows.peak(Grid, Profiles.get(time, Demand, params).window),
+                         Grid_max=np.max(Grid), soc_end=soc[-1], C_tot=C_tot, C_dem=C_dem,
+                         C_energy=C_energy, C_bat=C_bat, t_eol_bat=t_eol_bat, dBattery_max=0.0)
+
+    for name, lookahead in (('lookahead', True), ('causal', False)):
+        Battery, Grid, soc, Peakdemand = stream(lim, size, time, Demand, params, lookahead, chunk)
+        # The soc of the causal controller is not monotonic within the blocks
+        aging_params = params if lookahead else replace(params, algorithm='online')
+        t_eol_bat = (getattr(AgingModels, params.agingmodel)(time, Battery, soc, size, aging_params)
+                     if size > 0 else np.nan)
+        C_tot,C_dem,C_energy,C_bat,_,_,t_eol_bat = Objective.cost(
+            lim, size, (t_eol_bat, np.max(Grid), sum(Grid), Peakdemand), time, Demand, [], params)
+        rows[name] = dict(Peakdemand=Peakdemand, Grid_max=np.max(Grid), soc_end=soc[-1],
+                          C_tot=C_tot, C_dem=C_dem, C_energy=C_energy, C_bat=C_bat,
+                          t_eol_bat=t_eol_bat, dBattery_max=np.max(np.abs(Battery-Battery_batch)))
+
+    return pd.DataFrame.from_dict(rows, orient='index')
@@ -0,0 +1,83 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used to define optimisers for the size and limit of the SES 
+#   that can be used instead of the Nelder-Mead search in 'Sweep'.
+#   'limit_search': For a given battery size, the costs are evaluated on a grid
+#   of limits in one batched simulation and the grid is narrowed around the best
+#   limit until its spacing is below xatol. The size is first evaluated on a 
+#   coarse grid and then refined by a bounded 1-D search next to the best size.
+#   Note: the feasibility of the prescient algorithm is not monotone in the 
+#   limit and the optimum is usually above the limit that the SES can hold, 
+#   therefore the best limit is searched by grid refinement instead of bisection.
+# -------------
+# Input: 
+#   time, Demand, C_tru, params
+# ------------
+# Output: 
+#   OptimizeResult (x = [opt_lim, opt_size], fun, nfev, nsim)
+# ------------
+
+# %% Import libraries
+import numpy as np
+from scipy.optimize import OptimizeResult, minimize_scalar
+
+import Objective
+import Profiles
+
+# %% Limit search
+
+def limit_search(time, Demand, C_tru, params, xatol=1, n_lim=32, n_size=16):
+    profile = Profiles.get(time, Demand, params)
+    counter = {'nfev': 0, 'nsim': 0}
+    
+    # Best limit and costs for the given sizes
+    def best_limit(sizes):
+        lo = np.full(len(sizes), np.mean(Demand))
+        hi = np.full(len(sizes), profile.Peakdemand_z)
+        x = np.full(len(sizes), profile.Peakdemand_z)
+        fun = np.full(len(sizes), np.inf)
+        while True:
+            lims = lo[:,None] + (hi-lo)[:,None]*np.linspace(0,1,n_lim)
+            C_tot = Objective.batch(lims.ravel(), np.repeat(sizes, n_lim), 
+                                    time, Demand, C_tru, params)[0].reshape(lims.shape)
+            counter['nfev'] += lims.size
+            counter['nsim'] += 1
+            
+            # Keep the best limit of every size
+            C_tot = np.where(np.isnan(C_tot), np.inf, C_tot)
+            i = np.argmin(C_tot, axis=1)
+            better = C_tot[np.arange(len(sizes)),i] < fun
+            x[better] = lims[better,i[better]]
+            fun[better] = C_tot[better,i[better]]
+            
+            # Narrow the grid around the best limit
+            step = (hi-lo)/(n_lim-1)
+            if max(step) <= xatol:
+                break
+            lo = np.maximum(np.mean(Demand), x-step)
+            hi = np.minimum(profile.Peakdemand_z, x+step)
+        return x, fun
+    
+    # Coarse grid of sizes, upper bound: energy above the mean demand
+    size_max = np.sum(np.maximum(Demand-np.mean(Demand),0))*profile.dt/3600/(params.soc_max-params.soc_min)
+    sizes = np.linspace(0, size_max, n_size)
+    lims, funs = best_limit(sizes)
+    k = np.argmin(funs)
+    
+    # Bounded search next to the best size of the coarse grid
+    res = minimize_scalar(lambda size: min(best_limit(np.array([size]))[1][0], np.finfo(float).max),
+                          bounds=(sizes[max(k-1,0)], sizes[min(k+1,n_size-1)]), 
+                          method='bounded', options={'xatol': xatol})
+    opt_lim, fun = best_limit(np.array([res.x]))
+    if fun[0] < funs[k]:
+        x = [opt_lim[0], res.x]
+    else:
+        x, fun = [lims[k], sizes[k]], funs[k:k+1]
+    
+    return OptimizeResult(x=np.array(x), fun=fun[0], success=bool(np.isfinite(fun[0])),
+                          nit=res.nit, nfev=counter['nfev'], nsim=counter['nsim'])
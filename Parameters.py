@@ -0,0 +1,69 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script defines the immutable parameter set that is passed to the 
+#   objective function, the algorithms and the aging models. The values in 
+#   'config' are only used as defaults, so several scenarios can be evaluated 
+#   side by side in one process, in threads or on worker processes.
+# -------------
+# Input: 
+#   config, changes
+# ------------
+# Output: 
+#   Parameters
+# ------------
+
+# %% Import libraries
+from dataclasses import dataclass, fields, replace
+import config as cf
+
+# %% Parameter set
+
+@dataclass(frozen=True)
+class Parameters:
+    # Cell parameters
+    soc_max: float
+    soc_min: float
+    Crate_max: float
+    Crate_min: float
+    eta: float
+    
+    # Aging parameters
+    EOL: float
+    tmax: float
+    nmax: float
+    T_a: float
+    k_dod: float
+    k_soc: float
+    soc_ref: float
+    t_eol_tru: float
+    t_eol_dcdc: float
+    
+    # Cost parameters
+    r: float
+    c_bat: float
+    c_tru: float
+    c_dcdc: float
+    c_energy: float
+    c_dem_contr: float
+    c_dem_uncontr: float
+    delta_t: int
+    
+    # Selected models
+    agingmodel: str
+    algorithm: str
+    optimizer: str
+    
+    # Check ups
+    def __post_init__(self):
+        if self.soc_max-self.soc_min > self.EOL:
+            raise ValueError('soc limits too large to cycle until EOL condition')
+
+# Parameter set with the current values of 'config' and the given changes
+def default(**changes):
+    params = Parameters(**{f.name: getattr(cf, f.name) for f in fields(Parameters)})
+    return replace(params, **changes)
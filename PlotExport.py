@@ -0,0 +1,118 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description:
+#   This script is used to export the plots of 'MyPlots' to files without an
+#   interactive session. The power curve plots of the selected terminals are
+#   rendered on a process pool. Every figure is drawn on its own Agg canvas,
+#   the power curves are reduced to the minimum and maximum per pixel column
+#   before plotting, so the peaks are kept for profiles of any length. The
+#   result plots are rendered in a worker with the Agg backend, so the
+#   figures of the sweep do not stay in the main process (without 'fork' in
+#   the current process, only the new figures are closed).
+# -------------
+# Input:
+#   Powerprofile, results from 'Sweep', directory
+# ------------
+# Output:
+#   plot files (one per terminal, BLEL and delta_t)
+# ------------
+
+# %% Import libraries
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import MyPlots
+import Objective
+import Parameters
+import Workers
+
+# %% Power curve plots
+
+# Power curve plot of one configuration written to a file
+def power_curves(time, Demand, lim, size, path, params=None, dpi=100):
+    if params is None:
+        params = Parameters.default()
+    _,_,_,_,_,_,_,Battery,Grid,soc = \
+        Objective.function([lim,size], time, Demand, [], 'full', params)
+
+    fig = Figure(constrained_layout=True, figsize=(16,9), dpi=dpi)
+    FigureCanvasAgg(fig)
+    MyPlots.power_curves_plot(Demand, Grid, Battery, soc, time, lim, size, params,
+                              xlim=None, columns=int(fig.get_figwidth()*dpi), fig=fig)
+    fig.savefig(path)
+    return path
+
+def _task(BLEL, ter, opt_lim, opt_size, params, path, dpi):
+    profile = Workers.Powerprofile[BLEL][ter]
+    return power_curves(profile['time'], profile['Demand'], opt_lim, opt_size, path, params, dpi)
+
+# %% Result plots
+
+# Result plots saved to files, the new figures are closed afterwards
+def _save_results(df, directory, fmt, dpi):
+    import matplotlib.pyplot as plt
+    existing = set(plt.get_fignums())
+    MyPlots.result_plots(df)
+    paths = []
+    for num in [num for num in plt.get_fignums() if num not in existing]:
+        paths.append(os.path.join(directory, 'results_%d.%s' % (len(paths), fmt)))
+        plt.figure(num).savefig(paths[-1], dpi=dpi)
+        plt.close(num)
+    return paths
+
+def _results_task(df, directory, fmt, dpi):
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+    return _save_results(df, directory, fmt, dpi)
+
+# Result plots written to files (rendered in a worker process if 'fork' is
+# available)
+def result_plots(df, directory, fmt='png', dpi=100):
+    os.makedirs(directory, exist_ok=True)
+    if not Workers.fork():
+        return _save_results(df, directory, fmt, dpi)
+    with ProcessPoolExecutor(max_workers=1, mp_context=Workers.context()) as pool:
+        return pool.submit(_results_task, df, directory, fmt, dpi).result()
+
+# %% Export
+
+# Power curve plots of the optimum of the selected terminals and BLELs (default:
+# all) and, if df is given, the result plots
+def run(Powerprofile, results, directory, BLELs=None, terminals=None, delta_t=30, df=None,
+        n_workers=None, params=None, fmt='png', dpi=100):
+    if params is None:
+        params = Parameters.default()
+    params = replace(params, delta_t=delta_t)
+    if BLELs is None:
+        BLELs = sorted(Powerprofile.keys(),reverse=True)
+    tasks = [(BLEL, ter) for BLEL in BLELs for ter in Powerprofile[BLEL].keys()
+             if terminals is None or ter in terminals]
+    os.makedirs(directory, exist_ok=True)
+
+    arguments = []
+    for BLEL, ter in tasks:
+        result = results.get(BLEL, ter, delta_t)
+        path = os.path.join(directory, '%s_%s_%d.%s' % (BLEL, ter, delta_t, fmt))
+        arguments.append((BLEL, ter, result['opt_lim'], result['opt_size'], params, path, dpi))
+
+    with Workers.pool(n_workers, Powerprofile) as pool:
+        # The result plots are rendered next to the power curves on a process
+        # pool, otherwise after them
+        figures = None
+        if df is not None and isinstance(pool, ProcessPoolExecutor):
+            figures = pool.submit(_results_task, df, directory, fmt, dpi)
+        paths = [pool.submit(_task, *a) for a in arguments]
+        paths = [path.result() for path in paths]
+        if figures is not None:
+            paths += figures.result()
+    if df is not None and figures is None:
+        paths += result_plots(df, directory, fmt, dpi)
+
+    return paths
@@ -0,0 +1,141 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used to convert the pickled power profiles into a directory 
+#   with one .npy file per array and an index file, and to load the profiles 
+#   lazily from this directory. The store has the same dict-like interface as 
+#   the pickled profiles (Powerprofile[BLEL][ter]['time'/'Demand'/'Nchargers']),
+#   but the arrays are only memory-mapped when a terminal is accessed.
+#   On conversion, the demand can be stored in single precision (dtype) and 
+#   aggregated to the longest time step (up to the 15 minute blocks of the
+#   prescient algorithm) at which the profile is piecewise constant, so the 
+#   aggregation only changes the costs by the length of one aggregated sample 
+#   in the annual scaling. The time step of every profile is 
+#   stored in the index. Equidistant time arrays are not stored, but generated
+#   from the start time and time step. Profiles are returned in double precision.
+# -------------
+# Input: 
+#   Input data (pickle file) with power profiles (Input/PowerProfile)
+# ------------
+# Output: 
+#   Directory with .npy files and index.json
+# ------------
+
+# %% Import libraries
+import json
+import os
+import pickle
+from collections.abc import Mapping
+import numpy as np
+
+import Profiles
+
+# %% Converter
+
+def convert(source, directory, dtype='float64', aggregate=False):
+    with open(source,'rb') as file:
+        Powerprofile = pickle.load(file)
+    
+    index = {'dtype': dtype, 'aggregate': aggregate, 'BLELs': {}}
+    for BLEL in Powerprofile.keys():
+        os.makedirs(os.path.join(directory, BLEL), exist_ok=True)
+        index['BLELs'][BLEL] = {}
+        for ter in Powerprofile[BLEL].keys():
+            path = os.path.join(directory, BLEL, ter)
+            time = np.asarray(Powerprofile[BLEL][ter]['time'], dtype=float)
+            Demand = np.asarray(Powerprofile[BLEL][ter]['Demand'], dtype=float)
+            entry = {'Nchargers': int(Powerprofile[BLEL][ter]['Nchargers']),
+                     'dt': Profiles.step(time), 't0': float(time[0])}
+            
+            # Aggregate equidistant profiles where they are piecewise constant
+            equidistant = np.array_equal(time, entry['t0'] + entry['dt']*np.arange(len(time)))
+            if aggregate and equidistant:
+                k = _constant(Demand, Profiles.samples(Profiles.block_duration, entry['dt']))
+                Demand = Demand[::k]
+                entry['dt'] = entry['dt']*k
+                time = entry['t0'] + entry['dt']*np.arange(len(Demand))
+            
+            if not equidistant:
+                np.save(path + '.time.npy', time)
+            elif os.path.isfile(path + '.time.npy'):
+                os.remove(path + '.time.npy')
+            np.save(path + '.Demand.npy', Demand.astype(dtype))
+            entry['n'] = len(Demand)
+            entry['equidistant'] = bool(equidistant)
+            index['BLELs'][BLEL][ter] = entry
+    
+    # The index is written last, so an interrupted conversion is not used
+    with open(os.path.join(directory, 'index.json'),'w') as file:
+        json.dump(index, file)
+
+# Largest number of samples (divisor of the block) over which the demand is constant
+def _constant(Demand, block):
+    for k in range(block, 1, -1):
+        if block % k == 0 and len(Demand) % k == 0:
+            groups = Demand.reshape(-1, k)
+            if np.all(groups == groups[:,:1]):
+                return k
+    return 1
+
+# %% Loader
+
+class ProfileStore(Mapping):
+    
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'index.json')) as file:
+            self.index = json.load(file)['BLELs']
+    
+    def __getitem__(self, BLEL):
+        return _BLELView(self.directory, BLEL, self.index[BLEL])
+    
+    def __iter__(self):
+        return iter(self.index)
+    
+    def __len__(self):
+        return len(self.index)
+
+class _BLELView(Mapping):
+    
+    def __init__(self, directory, BLEL, index):
+        self.directory = directory
+        self.BLEL = BLEL
+        self.index = index
+    
+    # Profile of one terminal with memory-mapped arrays (single precision 
+    # demand is converted to double precision)
+    def __getitem__(self, ter):
+        path = os.path.join(self.directory, self.BLEL, ter)
+        entry = self.index[ter]
+        Demand = np.load(path + '.Demand.npy', mmap_mode='r')
+        if Demand.dtype != np.float64:
+            Demand = Demand.astype(float)
+        if entry['equidistant']:
+            time = entry['t0'] + entry['dt']*np.arange(entry['n'])
+        else:
+            time = np.load(path + '.time.npy', mmap_mode='r')
+        return {'time': time, 'Demand': Demand, 'Nchargers': entry['Nchargers'], 'dt': entry['dt']}
+    
+    def __iter__(self):
+        return iter(self.index)
+    
+    def __len__(self):
+        return len(self.index)
+
+# Open the store, the pickled profiles are converted on first use, if they 
+# have changed since the last conversion or if the settings have changed
+def load(source, directory, dtype='float64', aggregate=False):
+    index = os.path.join(directory, 'index.json')
+    if not os.path.isfile(index) or (
+            os.path.isfile(source) and os.path.getmtime(source) > os.path.getmtime(index)):
+        convert(source, directory, dtype, aggregate)
+    else:
+        with open(index) as file:
+            settings = json.load(file)
+        if settings.get('dtype') != dtype or settings.get('aggregate') != aggregate:
+            convert(source, directory, dtype, aggregate)
+    return ProfileStore(directory)
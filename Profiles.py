@@ -0,0 +1,112 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used to precompute the statistics of a power profile that
+#   only depend on the profile and the configuration (windowed peak demand,
+#   annual energy scaling, block statistics). The profiles are cached by the
+#   identity of the time and demand arrays and delta_t, so they are built once
+#   per BLEL, terminal and delta_t, also if only cost parameters change.
+# -------------
+# Input: 
+#   time, Demand, params
+# ------------
+# Output: 
+#   Profile
+# ------------
+
+# %% Import libraries
+import Parameters
+import numpy as np
+import Instrumentation
+import Windows
+from collections import OrderedDict
+
+block_duration = 900 # duration of the blocks of the prescient algorithm in s
+
+# %% Profile statistics
+
+class Profile:
+    
+    def __init__(self, time, Demand, params):
+        self.time = time
+        self.Demand = Demand
+        
+        # Time step
+        self.dt = step(time) # time step in s
+        self.per_hour = 3600/self.dt # samples per hour
+        self.block = samples(block_duration, self.dt) # samples per block of the prescient algorithm
+        
+        # Demand charge windows
+        self.delta_t = params.delta_t
+        self.window = samples(params.delta_t*60, self.dt) # samples per demand charge window
+        self.Demand_windows = Windows.means(Demand, self.window) # time averaged demand per window
+        self.Peakdemand_z = np.max(self.Demand_windows) # time averaged peak power without SES
+        
+        # Annual energy scaling
+        self.n_days = (time[-1]-time[0])/3600/24
+        self.energy_factor = self.dt/3600*365/self.n_days # kW per sample to annual kWh
+        
+        # Block statistics
+        self.blocks, self.dur, self.mean_Demand, self.n_charging = block_statistics(Demand, self.block)
+        self.weights = np.zeros(self.blocks.size) # trapezoidal integration weights in s
+        self.weights[:len(Demand)-1] += np.diff(time)/2
+        self.weights[1:len(Demand)] += np.diff(time)/2
+        self.weights = self.weights.reshape(self.blocks.shape)
+
+# Annuity factor for the interest rate r and the lifetime t in years
+def annuity(r, t):
+    return (r*(1+r)**t)/((1+r)**t-1)
+
+# Time step of a profile in s
+def step(time):
+    return float(time[1]-time[0])
+
+# Number of samples of a duration in s
+def samples(duration, dt):
+    n = int(round(duration/dt))
+    if n < 1 or n*dt != duration:
+        raise ValueError('%g s is not a multiple of the time step of %g s' % (duration, dt))
+    return n
+
+# Block statistics of the demand profile in 15 minute blocks (90 samples at 10 s)
+def block_statistics(Demand, block=90):
+    n_blocks = -(-len(Demand)//block)
+    blocks = np.zeros((n_blocks,block)) # demand profile padded to full blocks
+    blocks.flat[:len(Demand)] = Demand
+    dur = np.full(n_blocks,block) # number of samples per block
+    dur[-1] = len(Demand) - block*(n_blocks-1)
+    mean_Demand = np.mean(blocks,axis=1) # mean demand per block
+    mean_Demand[-1] = np.mean(Demand[block*(n_blocks-1):]) # ragged last block
+    n_charging = np.count_nonzero(blocks>0,axis=1) # samples with demand per block
+    
+    return(blocks, dur, mean_Demand, n_charging)
+
+# %% Profile cache
+
+cache_size = 16 # number of cached profiles
+_cache = OrderedDict()
+
+# Return the cached profile for the given arrays and parameters
+def get(time, Demand, params=None):
+    if params is None:
+        params = Parameters.default()
+    key = (id(time), id(Demand), params.delta_t)
+    profile = _cache.get(key) # cached profiles keep their arrays alive, so ids are unique
+    if profile is not None:
+        _cache.move_to_end(key)
+        return profile
+    
+    with Instrumentation.timer_for('profile'):
+        profile = Profile(time, Demand, params)
+    _cache[key] = profile
+    if len(_cache) > cache_size:
+        _cache.popitem(last=False)
+    return profile
+
+# Remove all cached profiles
+def clear_cache():
+    _cache.clear()
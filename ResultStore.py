@@ -0,0 +1,148 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used to collect the results of the optimisation. The results
+#   are stored column-wise and the DataFrame is only built once when it is 
+#   requested. A dictionary index on (BLEL, terminal, delta_t) is used for
+#   lookups, e.g. of the TRU costs of the highest BLEL.
+#   'write' stores the results with the types of 'schema' as Parquet or 
+#   Feather files partitioned by delta_t and BLEL (Hive layout, e.g.
+#   Results/results/delta_t=30/BLEL=BLEL050/results.parquet, requires pyarrow).
+#   'read' loads only the requested columns and partitions.
+# -------------
+# Input: 
+#   results (one dictionary per terminal, BLEL and delta_t)
+# ------------
+# Output: 
+#   DataFrame with the results, partitioned result files
+# ------------
+
+# %% Import libraries
+import glob
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# Columns of the result table
+columns = ['terminal','BLEL','delta_t','n_chargers','opt_lim','opt_size','C_tot','C_dem','C_energy','C_bat','C_tru','C_dcdc','t_eol_bat','C_tot_z','C_dem_z','C_energy_z','C_tru_z','CRF']
+
+# Types of the result columns and of the optional columns derived in 'Main'
+schema = {'terminal': 'str', 'BLEL': 'str', 'delta_t': 'int64', 'n_chargers': 'int64'}
+schema.update({c: 'float64' for c in columns if c not in schema})
+schema.update({'share_of_demand': 'float64', 'share_of_demand_z': 'float64'})
+
+partitions = ['delta_t', 'BLEL'] # partition columns of the result files
+extensions = {'parquet': 'parquet', 'feather': 'feather'}
+
+# %% Result store
+
+class ResultStore:
+    
+    def __init__(self):
+        self.data = {c: [] for c in columns} # results column by column
+        self.index = {} # row number for (BLEL, terminal, delta_t)
+        self._df = None
+        self.profiling = [] # reports of the instrumentation (see Instrumentation)
+    
+    def __len__(self):
+        return len(self.index)
+    
+    # Add the result of one terminal, BLEL and delta_t
+    def append(self, result):
+        key = (result['BLEL'], result['terminal'], result['delta_t'])
+        if key in self.index:
+            raise KeyError('Result for %s, %s, delta_t=%s already stored' % key)
+        self.index[key] = len(self.index)
+        for c in columns:
+            self.data[c].append(result.get(c))
+        self._df = None
+    
+    # Result of one terminal, BLEL and delta_t as dictionary
+    def get(self, BLEL, ter, delta_t):
+        row = self.index[(BLEL, ter, delta_t)]
+        return {c: self.data[c][row] for c in columns}
+    
+    # Results as DataFrame (built once per change of the store)
+    def frame(self):
+        if self._df is None:
+            self._df = pd.DataFrame(self.data, columns=columns)
+        return self._df.copy()
+
+# Result store from a DataFrame, e.g. loaded from 'Results/results.csv'
+def from_frame(df):
+    store = ResultStore()
+    for result in df.to_dict('records'):
+        store.append(result)
+    return store
+
+# %% Result files
+
+# Results with the types of the schema (list-like or invalid numbers are NaN)
+def typed(df):
+    missing = [c for c in columns if c not in df.columns]
+    unknown = [c for c in df.columns if c not in schema]
+    if missing or unknown:
+        raise ValueError('Results do not match the schema (missing: %s, unknown: %s)' % (missing, unknown))
+    df = df[[c for c in schema if c in df.columns]].copy()
+    for c in df.columns:
+        if schema[c] == 'float64':
+            values = [np.nan if np.ndim(x) else x for x in df[c]]
+            df[c] = pd.to_numeric(pd.Series(values, index=df.index), errors='coerce').astype('float64')
+        else:
+            df[c] = df[c].astype(schema[c])
+    return df
+
+# Write the results (store or DataFrame) partitioned by delta_t and BLEL
+def write(results, directory, fmt='parquet'):
+    if fmt not in extensions:
+        raise ValueError("Unknown result format '%s'" % fmt)
+    if pyarrow is None:
+        raise ImportError('pyarrow is required to write %s files' % fmt)
+    df = typed(results.frame() if isinstance(results, ResultStore) else results)
+    
+    # Remove the files of a previous run
+    for path in glob.glob(os.path.join(directory, 'delta_t=*', 'BLEL=*', 'results.*')):
+        os.remove(path)
+    
+    for (delta_t, BLEL), part in df.groupby(partitions, sort=True):
+        path = os.path.join(directory, 'delta_t=%d' % delta_t, 'BLEL=%s' % BLEL)
+        os.makedirs(path, exist_ok=True)
+        part = part.drop(columns=partitions).reset_index(drop=True)
+        if fmt == 'parquet':
+            part.to_parquet(os.path.join(path, 'results.parquet'), index=False)
+        else:
+            part.to_feather(os.path.join(path, 'results.feather'))
+
+# Read the selected columns (default: all) of the selected partitions (default: all)
+def read(directory, columns=None, delta_ts=None, BLELs=None):
+    if pyarrow is None:
+        raise ImportError('pyarrow is required to read result files')
+    selected = None if columns is None else [c for c in columns if c not in partitions]
+    parts = []
+    for path in sorted(glob.glob(os.path.join(directory, 'delta_t=*', 'BLEL=*', 'results.*'))):
+        folder, name = os.path.split(path)
+        BLEL = os.path.basename(folder)[len('BLEL='):]
+        delta_t = int(os.path.basename(os.path.dirname(folder))[len('delta_t='):])
+        if (delta_ts is not None and delta_t not in delta_ts) or (BLELs is not None and BLEL not in BLELs):
+            continue
+        if name.endswith('.parquet'):
+            part = pd.read_parquet(path, columns=selected)
+        else:
+            part = pd.read_feather(path, columns=selected)
+        parts.append(part.assign(delta_t=delta_t, BLEL=BLEL))
+    
+    if columns is None:
+        columns = [c for c in schema if any(c in part.columns for part in parts)]
+    if not parts:
+        return pd.DataFrame({c: pd.Series(dtype=schema[c]) for c in columns})
+    df = pd.concat(parts, ignore_index=True)
+    return df[list(columns)].astype({c: schema[c] for c in columns})
@@ -0,0 +1,189 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description:
+#   This script is used to evaluate the optimal SES design of the terminals for
+#   many parameter scenarios (a grid of values or Monte Carlo samples of the
+#   parameters in 'Parameters'). The dispatch only depends on the cell
+#   parameters (soc limits, C-rates, efficiency) and its summary additionally
+#   on the stress factors of the rainflow aging model, therefore the samples 
+#   are grouped by these parameters and the dispatch of a grid of limits and 
+#   sizes is simulated once per group and terminal. Every sample only prices these
+#   dispatch summaries. The best grid point of every sample is refined on
+#   successively finer local grids. The 'lp' dispatch also depends on the
+#   energy and demand charges, so these are part of its groups.
+#   The TRU costs of the highest BLEL are used for all other BLELs (as in
+#   'Sweep'), therefore the highest BLEL of a terminal is evaluated first.
+# -------------
+# Input:
+#   Powerprofile, samples, params
+# ------------
+# Output:
+#   table with the optimum of every terminal and sample, table of quantiles
+# ------------
+
+# %% Import libraries
+import itertools
+from dataclasses import replace
+import numpy as np
+import pandas as pd
+
+import Objective
+import Parameters
+import Profiles
+import Workers
+
+dispatch_parameters = ('soc_max', 'soc_min', 'Crate_max', 'Crate_min', 'eta', # parameters of the dispatch
+                       'k_dod', 'k_soc', 'soc_ref') # and of the cycles of the rainflow aging model
+lp_parameters = ('c_energy', 'c_dem_contr', 'c_dem_uncontr') # costs minimised by the 'lp' dispatch
+
+# %% Samples
+
+# All combinations of the given parameter values
+def grid(**values):
+    names = list(values.keys())
+    return [dict(zip(names, v)) for v in itertools.product(*values.values())]
+
+# Random samples of the given distributions (scipy.stats distributions or
+# sequences of values that are drawn with equal probability)
+def monte_carlo(n, seed=0, **distributions):
+    rng = np.random.RandomState(seed)
+    columns = {}
+    for name, distribution in distributions.items():
+        if hasattr(distribution, 'rvs'):
+            columns[name] = distribution.rvs(size=n, random_state=rng)
+        else:
+            columns[name] = np.asarray(distribution)[rng.randint(0, len(distribution), n)]
+    return [{name: float(columns[name][k]) for name in columns} for k in range(n)]
+
+# %% Optimisation of a single terminal
+
+# tru: TRU costs (C_tru, C_tru_z) of every sample, None: TRU sized for the
+# grid power of the terminal
+def optimise(time, Demand, samples, params=None, n_lim=33, n_size=33, refine=3, tru=None):
+    if params is None:
+        params = Parameters.default()
+    if tru is None:
+        tru = [([], [])]*len(samples)
+    rows = [None]*len(samples)
+
+    # Group the samples by their dispatch parameters
+    names = dispatch_parameters + (lp_parameters if params.algorithm == 'lp' else ())
+    groups = {}
+    for k, sample in enumerate(samples):
+        cell = replace(params, **{name: sample[name] for name in sample if name in names})
+        groups.setdefault(tuple(getattr(cell, name) for name in names), []).append(k)
+
+    for group in groups.values():
+        cell = replace(params, **{name: samples[group[0]][name] for name in samples[group[0]]
+                                  if name in names})
+        profile = Profiles.get(time, Demand, cell)
+
+        # Coarse grid of limits and sizes, upper bound of the size: maximum
+        # daily energy above the mean demand
+        excess = np.maximum(Demand-np.mean(Demand),0)*profile.dt/3600
+        daily = np.bincount((np.asarray(time)//86400).astype(int), weights=excess)
+        size_max = np.max(daily)/(cell.soc_max-cell.soc_min)
+        lim_axis = np.linspace(np.mean(Demand), profile.Peakdemand_z, n_lim)
+        size_axis = np.linspace(0, size_max, n_size)
+        lims, sizes = [x.ravel() for x in np.meshgrid(lim_axis, size_axis, indexing='ij')]
+        summaries = Objective.summaries(lims, sizes, time, Demand, cell)
+
+        # Best grid point of every sample
+        best = {}
+        for k in group:
+            sample_params = replace(params, **samples[k])
+            C_tot = Objective.price(lims, sizes, summaries, time, Demand, tru[k][0], sample_params)[0]
+            C_tot = np.where(np.isnan(C_tot), np.inf, C_tot)
+            i = np.argmin(C_tot)
+            best[k] = (lims[i], sizes[i], C_tot[i])
+
+        # Refine around the best point of every sample (one dispatch simulation
+        # for the local grids of all samples of the group)
+        step_lim = lim_axis[1]-lim_axis[0]
+        step_size = size_axis[1]-size_axis[0]
+        for _ in range(refine):
+            step_lim, step_size = step_lim/2, step_size/2
+            local = np.array([[lim + a*step_lim, size + b*step_size]
+                              for lim, size, _ in best.values() for a in (-1,0,1) for b in (-1,0,1)])
+            local = np.unique(local, axis=0)
+            local = local[(local[:,0] <= profile.Peakdemand_z) & (local[:,1] >= 0)]
+            summaries = Objective.summaries(local[:,0], local[:,1], time, Demand, cell)
+            for k in group:
+                sample_params = replace(params, **samples[k])
+                C_tot = Objective.price(local[:,0], local[:,1], summaries, time, Demand, tru[k][0], sample_params)[0]
+                C_tot = np.where(np.isnan(C_tot), np.inf, C_tot)
+                i = np.argmin(C_tot)
+                if C_tot[i] < best[k][2]:
+                    best[k] = (local[i,0], local[i,1], C_tot[i])
+
+        # Cost components of the optimum and without SES
+        for k in group:
+            sample_params = replace(params, **samples[k])
+            opt_lim, opt_size, _ = best[k]
+            points = ([opt_lim, profile.Peakdemand_z], [opt_size, 0])
+            summaries = Objective.summaries(*points, time, Demand, cell)
+            # Optimum and no SES priced with their own TRU costs
+            priced = [Objective.price(points[0][i:i+1], points[1][i:i+1], [x[i:i+1] for x in summaries],
+                                      time, Demand, tru[k][i], sample_params) for i in range(2)]
+            C_tot,C_dem,C_energy,C_bat,C_tru,C_dcdc,t_eol_bat,_ = [np.concatenate(c) for c in zip(*priced)]
+            rows[k] = dict(samples[k], sample=k, opt_lim=opt_lim, opt_size=opt_size,
+                           C_tot=C_tot[0], C_dem=C_dem[0], C_energy=C_energy[0], C_bat=C_bat[0],
+                           C_tru=C_tru[0], C_dcdc=C_dcdc[0], t_eol_bat=t_eol_bat[0],
+                           C_tot_z=C_tot[1], C_tru_z=C_tru[1], CRF=100*(C_tot[1]-C_tot[0])/C_tot[1])
+
+    return rows
+
+# %% Scenarios for several terminals
+
+def _task(BLEL, ter, samples, params, n_lim, n_size, refine, tru=None):
+    profile = Workers.Powerprofile[BLEL][ter]
+    rows = optimise(profile['time'], profile['Demand'], samples, params, n_lim, n_size, refine, tru)
+    return [dict(row, terminal=ter, BLEL=BLEL) for row in rows]
+
+# Optimum of every selected terminal (default: all) and sample
+def run(Powerprofile, samples, BLELs=None, terminals=None, delta_t=30, n_workers=None,
+        params=None, n_lim=33, n_size=33, refine=3):
+    if params is None:
+        params = Parameters.default()
+    params = replace(params, delta_t=delta_t)
+    if (params.delta_t*60) % Profiles.block_duration:
+        raise ValueError('delta_t has to be a multiple of 15 minutes')
+    if BLELs is None:
+        BLELs = sorted(Powerprofile.keys(),reverse=True)
+    tasks = [(BLEL, ter) for BLEL in BLELs for ter in Powerprofile[BLEL].keys()
+             if terminals is None or ter in terminals]
+
+    # The highest BLEL of every selected terminal is evaluated first (also if
+    # it is not selected), the other BLELs use its TRU costs of every sample
+    highest = max(Powerprofile.keys())
+    first = [(highest, ter) for ter in Powerprofile[highest].keys() if ter in {t for _, t in tasks}]
+    others = [task for task in tasks if task[0] != highest]
+    def evaluate(mapping):
+        def execute(stage, tru):
+            arguments = [(BLEL, ter, samples, params, n_lim, n_size, refine, tru.get(ter))
+                         for BLEL, ter in stage]
+            return dict(zip(stage, mapping(_task, *zip(*arguments)))) if arguments else {}
+        rows = execute(first, {})
+        tru = {ter: [(row['C_tru'], row['C_tru_z']) for row in rows[(BLEL, ter)]] for BLEL, ter in first}
+        rows.update(execute(others, tru))
+        return rows
+
+    with Workers.pool(n_workers, Powerprofile) as pool:
+        rows = evaluate(pool.map)
+
+    df = pd.DataFrame([row for task in tasks for row in rows[task]])
+    first = ['terminal', 'BLEL', 'sample'] + list(samples[0].keys()) if samples else []
+    return df[first + [c for c in df.columns if c not in first]]
+
+# Quantiles of the results of all samples (one row per terminal, BLEL,
+# variable and quantile)
+def quantiles(df, q=(0.05, 0.5, 0.95), variables=('opt_lim', 'opt_size', 'C_tot', 'CRF'),
+              by=('terminal', 'BLEL')):
+    table = df.groupby(list(by))[list(variables)].quantile(list(q))
+    table.index = table.index.set_names('quantile', level=-1)
+    table.columns.name = 'variable'
+    return table.stack().rename('value').reset_index()
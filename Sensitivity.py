@@ -0,0 +1,230 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description:
+#   This script is used to calculate the costs on the lim x size grid of the
+#   contour plots. 'full' evaluates every grid point. 'adaptive' evaluates a
+#   coarse subgrid first. The midpoints of every cell are evaluated and a cell
+#   is only split further if the feasibility changes, the peak shaving limit 
+#   is exceeded at some but not all points, the bilinear interpolation from 
+#   the corners misses the total costs at the midpoints by more than tol 
+#   (relative to the lowest costs) or the lowest costs found so far are 
+#   located in the cell. All other grid points are interpolated bilinearly.
+#   'run' computes the surfaces and the line at which the peak shaving limit 
+#   is exceeded for a selection of terminals and BLELs on a process pool and
+#   stores them in one compressed array file, from which the contour plots 
+#   can be generated later ('load', 'surface').
+# -------------
+# Input:
+#   lim, size, time, Demand, C_tru, params
+# ------------
+# Output:
+#   C_tot, C_dem, C_energy, C_bat, Peakdemand (len(lim) x len(size)) and the
+#   mask of the evaluated grid points
+# ------------
+
+# %% Import libraries
+from dataclasses import replace
+import numpy as np
+
+import Objective
+import Parameters
+import Profiles
+import Workers
+
+# %% Cost grids
+
+# Costs at all grid points
+def full(lim, size, time, Demand, C_tru, params=None):
+    lim_grid, size_grid = np.meshgrid(lim, size, indexing='ij')
+    costs = _evaluate(lim_grid.ravel(), size_grid.ravel(), time, Demand, C_tru, params)
+    return (*[c.reshape(lim_grid.shape) for c in costs], np.ones(lim_grid.shape, dtype=bool))
+
+# Costs on an adaptively refined grid
+def adaptive(lim, size, time, Demand, C_tru, params=None, tol=0.005, coarse=8):
+    if params is None:
+        params = Parameters.default()
+    lim = np.asarray(lim, dtype=float)
+    size = np.asarray(size, dtype=float)
+    shape = (len(lim), len(size))
+    costs = np.full((5,) + shape, np.nan) # C_tot, C_dem, C_energy, C_bat, Peakdemand
+    evaluated = np.zeros(shape, dtype=bool)
+
+    def evaluate(points):
+        points = sorted(p for p in points if not evaluated[p])
+        if points:
+            i, j = np.array(points).T
+            costs[:,i,j] = _evaluate(lim[i], size[j], time, Demand, C_tru, params)
+            evaluated[i,j] = True
+
+    # Coarse subgrid (step is a power of two, the last index is always included)
+    step = [2**max(0, int(np.log2(max(n-1, 1)/coarse))) for n in shape]
+    edges = [sorted(set(range(0, n, s)) | {n-1}) for n, s in zip(shape, step)]
+    cells = [(i0, i1, j0, j1) for i0, i1 in zip(edges[0], edges[0][1:])
+             for j0, j1 in zip(edges[1], edges[1][1:])]
+    evaluate([(i, j) for i in edges[0] for j in edges[1]])
+
+    # Split cells until the interpolation is accurate or they cannot be split
+    leaves = []
+    while cells:
+        leaves += [cell for cell in cells if cell[1]-cell[0] == 1 and cell[3]-cell[2] == 1]
+        cells = [cell for cell in cells if cell[1]-cell[0] > 1 or cell[3]-cell[2] > 1]
+        evaluate([(i, j) for cell in cells for i in _midpoints(cell[0], cell[1]) 
+                  for j in _midpoints(cell[2], cell[3])])
+        C_ref = np.nanmin(costs[0]) if np.any(~np.isnan(costs[0])) else np.nan
+        i_opt = np.unravel_index(np.nanargmin(costs[0]), shape) if not np.isnan(C_ref) else None
+        refined = []
+        for cell in cells:
+            if _refine(cell, costs, lim, size, C_ref, i_opt, tol):
+                refined += _split(cell)
+            else:
+                leaves += _split(cell)
+        cells = refined
+
+    # Interpolate the grid points that were not evaluated
+    filled = evaluated.copy()
+    for (i0, i1, j0, j1) in leaves:
+        if filled[i0:i1+1,j0:j1+1].all():
+            continue
+        u = _weights(lim[i0:i1+1], lim[i0], lim[i1])[:,None]
+        v = _weights(size[j0:j1+1], size[j0], size[j1])[None,:]
+        corners = costs[:,[i0,i0,i1,i1],[j0,j1,j0,j1]]
+        values = (corners[:,0,None,None]*(1-u)*(1-v) + corners[:,1,None,None]*(1-u)*v +
+                  corners[:,2,None,None]*u*(1-v) + corners[:,3,None,None]*u*v)
+        missing = ~filled[i0:i1+1,j0:j1+1]
+        costs[:,i0:i1+1,j0:j1+1][:,missing] = values[:,missing]
+        filled[i0:i1+1,j0:j1+1] = True
+
+    return (*costs, evaluated)
+
+# Line at which the peak shaving limit is exceeded (lowest limit for every size)
+def limit_exceeded(lim, Peakdemand):
+    exceeded = 0.99*Peakdemand < np.asarray(lim)[:,None]
+    return np.where(exceeded.any(axis=0), np.asarray(lim)[np.argmax(exceeded, axis=0)], np.nan)
+
+# %% Surfaces of several terminals
+
+# Grid of the contour plots (50 points and the optimum, if it is known). The
+# optimum can coincide with a grid point, so the axes may contain duplicates
+def axes(time, Demand, params, opt_lim=np.nan, opt_size=np.nan):
+    Peakdemand_z = Profiles.get(time, Demand, params).Peakdemand_z
+    if np.isnan(opt_lim) or np.isnan(opt_size):
+        return np.linspace(np.mean(Demand),Peakdemand_z,51), np.linspace(0,400,51)
+    lim = np.append(opt_lim, np.linspace(np.mean(Demand),Peakdemand_z,50))
+    lim.sort()
+    size = np.append(opt_size, np.linspace(0,400,50))
+    size.sort()
+    return lim, size
+
+def _task(BLEL, ter, opt_lim, opt_size, params, method, tol):
+    time = Workers.Powerprofile[BLEL][ter]['time']
+    Demand = Workers.Powerprofile[BLEL][ter]['Demand']
+    lim, size = axes(time, Demand, params, opt_lim, opt_size)
+    if method == 'adaptive':
+        costs = adaptive(lim, size, time, Demand, [], params, tol=tol)
+    else:
+        costs = full(lim, size, time, Demand, [], params)
+    return lim, size, costs[:4], limit_exceeded(lim, costs[4])
+
+# Surfaces of the selected terminals and BLELs (default: all), the optimum is
+# taken from the results of the sweep if they are given
+def run(Powerprofile, path, BLELs=None, terminals=None, delta_t=30, results=None,
+        n_workers=None, params=None, method='full', tol=0.005):
+    if params is None:
+        params = Parameters.default()
+    params = replace(params, delta_t=delta_t)
+    if BLELs is None:
+        BLELs = sorted(Powerprofile.keys(),reverse=True)
+    tasks = [(BLEL, ter) for BLEL in BLELs for ter in Powerprofile[BLEL].keys()
+             if terminals is None or ter in terminals]
+    
+    # Optimal configurations
+    opt = np.full((len(tasks), 2), np.nan)
+    if results is not None:
+        for k, (BLEL, ter) in enumerate(tasks):
+            result = results.get(BLEL, ter, delta_t)
+            opt[k] = result['opt_lim'], result['opt_size']
+    
+    arguments = [(BLEL, ter, opt[k,0], opt[k,1], params, method, tol) for k, (BLEL, ter) in enumerate(tasks)]
+    with Workers.pool(n_workers, Powerprofile) as pool:
+        surfaces = list(pool.map(_task, *zip(*arguments)))
+    
+    # Surfaces as single precision, axes and optimum as double precision
+    lim, size, costs, lim_exceeded = zip(*surfaces)
+    np.savez_compressed(path,
+                        BLEL=np.array([BLEL for BLEL, _ in tasks]),
+                        terminal=np.array([ter for _, ter in tasks]),
+                        delta_t=delta_t,
+                        opt_lim=opt[:,0], opt_size=opt[:,1],
+                        lim=np.array(lim), size=np.array(size),
+                        lim_exceeded=np.array(lim_exceeded),
+                        **{name: np.array([c[i] for c in costs], dtype=np.float32)
+                           for i, name in enumerate(('C_tot', 'C_dem', 'C_energy', 'C_bat'))})
+
+# Load a file written by 'run'
+def load(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+# Arguments of MyPlots.contour_plots for one terminal
+def surface(data, BLEL, ter):
+    k = np.flatnonzero((data['BLEL'] == BLEL) & (data['terminal'] == ter))[0]
+    return {'size': data['size'][k], 'lim': data['lim'][k],
+            'opt_size': data['opt_size'][k], 'opt_lim': data['opt_lim'][k],
+            'C_dem': data['C_dem'][k], 'C_energy': data['C_energy'][k],
+            'C_bat': data['C_bat'][k], 'C_tot': data['C_tot'][k],
+            'lim_exceeded': data['lim_exceeded'][k]}
+
+# %% Helpers
+
+# Cost components of the grid points (lim[k], size[k])
+def _evaluate(lims, sizes, time, Demand, C_tru, params):
+    C_tot, C_dem, C_energy, C_bat,_,_,_,Peakdemand = \
+        Objective.batch(lims, sizes, time, Demand, C_tru, params)
+    return C_tot, C_dem, C_energy, C_bat, Peakdemand
+
+# Relative position of x in the interval [a, b] (0 for intervals of zero width)
+def _weights(x, a, b):
+    return (x-a)/(b-a) if b > a else np.zeros(np.shape(x))
+
+# Corner and mid indices of an interval
+def _midpoints(a, b):
+    return (a, (a+b)//2, b) if b-a > 1 else (a, b)
+
+# Subcells of a cell
+def _split(cell):
+    i, j = _midpoints(*cell[:2]), _midpoints(*cell[2:])
+    return [(i0, i1, j0, j1) for i0, i1 in zip(i, i[1:]) for j0, j1 in zip(j, j[1:])]
+
+# Check if the subcells of a cell have to be split
+def _refine(cell, costs, lim, size, C_ref, i_opt, tol):
+    i0, i1, j0, j1 = cell
+    i, j = np.meshgrid(_midpoints(i0, i1), _midpoints(j0, j1), indexing='ij')
+    C_tot = costs[0,i,j]
+    Peakdemand = costs[4,i,j]
+
+    # Feasibility changes
+    infeasible = np.isnan(C_tot)
+    if infeasible.all():
+        return False
+    if infeasible.any():
+        return True
+
+    # Peak shaving limit exceeded at some points
+    exceeded = 0.99*Peakdemand < lim[i]
+    if exceeded.any() and not exceeded.all():
+        return True
+
+    # Location of the lowest costs
+    if i_opt is not None and i0 <= i_opt[0] <= i1 and j0 <= i_opt[1] <= j1:
+        return True
+
+    # Error of the bilinear interpolation from the corners
+    u = _weights(lim[i], lim[i0], lim[i1])
+    v = _weights(size[j], size[j0], size[j1])
+    C_int = (C_tot[0,0]*(1-u)*(1-v) + C_tot[0,-1]*(1-u)*v + 
+             C_tot[-1,0]*u*(1-v) + C_tot[-1,-1]*u*v)
+    return np.max(np.abs(C_tot - C_int)) > tol*C_ref
@@ -0,0 +1,253 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used to find the optimal size and limit of the SES for all
+#   terminals, BLELs and peak power averaging periods on a process pool. 
+#   The terminals are independent, except that the TRU costs of the highest 
+#   BLEL are used for all other BLELs. Therefore the tasks of the highest BLEL 
+#   are run first and the tasks of the other BLELs of a terminal are submitted 
+#   as soon as the corresponding result of the highest BLEL is available.
+#   With warm start, the BLELs of a terminal are solved in descending order 
+#   and the highest BLEL of a delta_t after the previous delta_t. Each 
+#   optimisation starts from the solution of its predecessor, scaled by the 
+#   ratio of the peak demands, with a small initial simplex.
+#   If a cache directory is given, every result is stored as soon as it is 
+#   available and reused in later runs with unchanged inputs (see 'Checkpoint').
+#   On platforms without 'fork' the default number of workers is 1 (see
+#   'Workers').
+# -------------
+# Input: 
+#   Powerprofile, delta_ts, n_workers, params, cache, warm_start, warm_step
+# ------------
+# Output: 
+#   ResultStore with the results of all terminals, BLELs and delta_t
+# ------------
+
+# %% Import libraries
+from collections import deque
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, wait
+from scipy.optimize import minimize
+
+from dataclasses import replace
+
+import Checkpoint
+import config as cf
+import Instrumentation
+import LinearProgram
+import Objective
+import Optimizers
+import Parameters
+import Profiles
+import ResultStore
+import Workers
+
+# %% Optimisation of a single terminal
+
+def optimise(time, Demand, C_tru, C_tru_z, params, warm=None, warm_step=0.05):
+    
+    # Calculate time averaged peak power without SES
+    Peakdemand_z = Profiles.get(time, Demand, params).Peakdemand_z
+    
+    # Determine initialisation point for the optimisation
+    Ebat_initial = 300 # Initial battery size in kWh, selected based on experience
+    Plim_initial = 0.95*Peakdemand_z # Initial peak shaving power in kW, selected based on experience
+    initials = [Plim_initial, Ebat_initial] # Initial values for optimization
+    
+    # Optimisation
+    with Instrumentation.timer_for('minimize'):
+        if params.optimizer == 'lp':
+            params = replace(params, algorithm='lp') # costs of the LP dispatch
+            res = LinearProgram.optimise(time, Demand, C_tru, params)
+        elif params.optimizer == 'limit_search':
+            res = Optimizers.limit_search(time, Demand, C_tru, params, xatol=1)
+        else:
+            options = {'xatol': 1, 'fatol':0.01, 'maxiter': 300}
+            simplex = _simplex(warm, warm_step, time, Demand, C_tru, params)
+            if simplex is not None:
+                res = minimize(Objective.function, warm,
+                              args = (time, Demand, C_tru, 'opt', params),
+                              method= 'Nelder-Mead', 
+                              options=dict(options, initial_simplex=simplex))
+            if simplex is None or np.isnan(res.fun):
+                # Cold start
+                Instrumentation.record('warm_start', False)
+                res = minimize(Objective.function, initials,                     
+                              args = (time, Demand, C_tru, 'opt', params),
+                              method= 'Nelder-Mead', 
+                              options=options)
+    Instrumentation.record('nit', res.nit)
+    Instrumentation.record('nfev', res.nfev)
+    Instrumentation.record('success', res.success)
+    
+    # Optimisation results
+    opt_size = res.x[1] # Optimal battery size
+    opt_lim = res.x[0] # Optimal peak shaving power
+    
+    # Calculate all cost components with SES
+    C_tot,C_dem,C_energy,C_bat,C_tru,C_dcdc,t_eol_bat= \
+         Objective.costs([opt_lim,opt_size], time, Demand, C_tru, params)
+    
+    # Calculate all cost components without SES
+    C_tot_z,C_dem_z,C_energy_z,_,C_tru_z,_,_= \
+         Objective.costs([Peakdemand_z,0], time, Demand, C_tru_z, params)
+    
+    # Calculate cost reduction factor (CRF)
+    CRF = 100*(C_tot_z - C_tot)/C_tot_z
+    
+    return {'opt_lim':opt_lim,
+            'opt_size':opt_size,
+            'C_tot':C_tot,
+            'C_dem':C_dem,
+            'C_energy':C_energy,
+            'C_bat':C_bat,
+            'C_tru': C_tru,
+            'C_dcdc':C_dcdc,
+            't_eol_bat':t_eol_bat,                            
+            'C_tot_z':C_tot_z,
+            'C_dem_z':C_dem_z,
+            'C_energy_z':C_energy_z,
+            'C_tru_z':C_tru_z,
+            'CRF': CRF,
+            }
+
+# Initial simplex around the warm start (relative step warm_step), None if it
+# is not feasible
+def _simplex(warm, warm_step, time, Demand, C_tru, params):
+    if warm is None or not np.all(np.isfinite(warm)):
+        return None
+    if np.isnan(Objective.function(warm, time, Demand, C_tru, 'opt', params)):
+        return None
+    Instrumentation.record('warm_start', True)
+    lim, size = warm
+    step_lim = max(warm_step*lim, 1) # kW
+    step_size = max(warm_step*size, 1) # kWh
+    return np.array([[lim, size], [lim - step_lim, size], [lim, size + step_size]])
+
+# %% Tasks executed on the worker processes
+
+def _task(BLEL, ter, delta_t, C_tru, C_tru_z, params, cache, seed=None, warm_step=0.05):
+    Instrumentation.start(terminal=ter, BLEL=BLEL, delta_t=delta_t, cached=False)
+    with Instrumentation.timer_for('task'):
+        result = _optimise_task(BLEL, ter, delta_t, C_tru, C_tru_z, params, cache, seed, warm_step)
+    result['profiling'] = Instrumentation.stop()
+    return result
+
+def _optimise_task(BLEL, ter, delta_t, C_tru, C_tru_z, params, cache, seed, warm_step):
+    profile = Workers.Powerprofile[BLEL][ter]
+    params = replace(params, delta_t=delta_t)
+    result = {'terminal':ter,
+              'BLEL':BLEL,
+              'delta_t':delta_t,
+              'n_chargers':profile['Nchargers']}
+    
+    # Warm start from the solution of the predecessor, scaled by the ratio of
+    # the peak demands
+    warm = None
+    if seed is not None:
+        (BLEL_s, ter_s, delta_t_s), lim_s, size_s = seed
+        source = Workers.Powerprofile[BLEL_s][ter_s]
+        ratio = (Profiles.get(profile['time'], profile['Demand'], params).Peakdemand_z/
+                 Profiles.get(source['time'], source['Demand'], replace(params, delta_t=delta_t_s)).Peakdemand_z)
+        warm = [lim_s*ratio, size_s*ratio]
+    
+    # Reuse the cached result if the inputs did not change
+    if cache:
+        key = Checkpoint.key(profile['time'], profile['Demand'], C_tru, C_tru_z, params,
+                             None if warm is None else warm + [warm_step])
+        cached = Checkpoint.load(cache, key)
+        if cached is not None:
+            Instrumentation.record('cached', True)
+            result.update(cached)
+            return result
+    
+    optimum = optimise(profile['time'], profile['Demand'], C_tru, C_tru_z, params, warm, warm_step)
+    if cache:
+        Checkpoint.save(cache, key, optimum)
+    result.update(optimum)
+    return result
+
+# %% Sweep over all terminals, BLELs and delta_t
+
+def run(Powerprofile, delta_ts=(15,30), n_workers=None, params=None, cache=None, warm_start=None,
+        warm_step=None):
+    if params is None:
+        params = Parameters.default()
+    if warm_start is None:
+        warm_start = cf.warm_start
+    if warm_step is None:
+        warm_step = cf.warm_step
+    n_workers = Workers.n_workers(n_workers)
+    
+    # Task graph: every task has at most one predecessor. The highest BLEL has 
+    # no dependencies, all other BLELs of a terminal depend on the result of 
+    # the highest BLEL for the same delta_t. With warm start, the BLELs are
+    # chained in descending order and the delta_t are chained for the highest BLEL
+    BLELs = sorted(Powerprofile.keys(),reverse=True)
+    order = [(BLEL, ter, t) for t in delta_ts for BLEL in BLELs for ter in Powerprofile[BLEL].keys()]
+    predecessor = {}
+    for ter in Powerprofile[BLELs[0]].keys():
+        for i, t in enumerate(delta_ts):
+            if warm_start and i > 0:
+                predecessor[(BLELs[0], ter, t)] = (BLELs[0], ter, delta_ts[i-1])
+            chain = [(BLEL, ter, t) for BLEL in BLELs if ter in Powerprofile[BLEL]]
+            for j, task in enumerate(chain[1:]):
+                predecessor[task] = chain[j] if warm_start else chain[0]
+    roots = [task for task in order if task not in predecessor]
+    dependents = {}
+    for task, parent in predecessor.items():
+        dependents.setdefault(parent, []).append(task)
+    
+    results = ResultStore.ResultStore()
+    profiling = []
+    def add(task, result):
+        report = result.pop('profiling', None)
+        if report is not None:
+            profiling.append(report)
+        results.append(result)
+        print('[%d/%d]' % (len(results), len(order)), *task) # Status update
+    def arguments(task):
+        BLEL, ter, t = task
+        # TRU costs of the highest BLEL
+        C_tru, C_tru_z = [], []
+        if BLEL != BLELs[0]:
+            result = results.get(BLELs[0], ter, t)
+            C_tru, C_tru_z = result['C_tru'], result['C_tru_z']
+        # Solution of the predecessor for the warm start
+        seed = None
+        if warm_start and task in predecessor:
+            result = results.get(*predecessor[task])
+            seed = (predecessor[task], result['opt_lim'], result['opt_size'])
+        return (*task, C_tru, C_tru_z, params, cache, seed, warm_step)
+    
+    if n_workers == 1:
+        # Execute in the current process, dependents directly after their predecessor
+        Workers.init(Powerprofile)
+        queue = deque(roots)
+        while queue:
+            task = queue.popleft()
+            add(task, _task(*arguments(task)))
+            queue.extendleft(reversed(dependents.get(task, [])))
+    else:
+        with Workers.pool(n_workers, Powerprofile) as pool:
+            pending = {pool.submit(_task, *arguments(task)): task for task in roots}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = pending.pop(future)
+                    add(task, future.result())
+                    # Submit the tasks that depend on this result
+                    for dependent in dependents.get(task, []):
+                        pending[pool.submit(_task, *arguments(dependent))] = dependent
+    
+    # Results in the order of the original loops
+    ordered = ResultStore.ResultStore()
+    for task in order:
+        ordered.append(results.get(*task))
+    position = {task: i for i, task in enumerate(order)}
+    ordered.profiling = sorted(profiling, key=lambda r: position[(r['BLEL'], r['terminal'], r['delta_t'])])
+    return ordered
@@ -0,0 +1,102 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script is used to aggregate power curves over consecutive windows of n
+#   samples (e.g. the demand charge windows of delta_t*60/dt samples). All windows 
+#   are computed with one reshape and sum, the last window may be shorter. 
+#   The functions work on 1-D curves and row-wise on 2-D arrays. 
+#   'StreamingPeak' updates the peak of the window means as samples arrive.
+#   'minmax' keeps the minimum and maximum of every window (downsampling of
+#   power curves for plots without losing the peaks).
+# -------------
+# Input: 
+#   X (power curve), n (samples per window)
+# ------------
+# Output: 
+#   window sums, means and peak
+# ------------
+
+# %% Import libraries
+import numpy as np
+
+# %% Window aggregation
+
+# Sums of consecutive windows of n samples along the last axis
+def sums(X, n):
+    X = np.asarray(X, dtype=float)
+    full = X.shape[-1]//n # number of complete windows
+    S = np.sum(X[...,:full*n].reshape(X.shape[:-1]+(full,n)),axis=-1)
+    if X.shape[-1] > full*n: # ragged last window
+        S = np.concatenate([S, np.sum(X[...,full*n:],axis=-1,keepdims=True)],axis=-1)
+    return S
+
+# Number of samples of the windows of a curve with N samples
+def lengths(N, n):
+    return np.minimum(n, N-np.arange(0,N,n))
+
+# Means of consecutive windows of n samples along the last axis
+def means(X, n):
+    X = np.asarray(X, dtype=float)
+    return sums(X, n)/lengths(X.shape[-1], n)
+
+# Peak of the window means along the last axis
+def peak(X, n):
+    return np.max(means(X, n),axis=-1)
+
+# Downsampling to n windows, the samples with the minimum and maximum of every
+# window (and the first and last sample) are kept in their original order
+def minmax(t, X, n):
+    t = np.asarray(t)
+    X = np.asarray(X, dtype=float)
+    w = -(-len(X)//n) # samples per window
+    if w <= 2:
+        return t, X
+    Y = np.pad(X, (0, -len(X) % w), mode='edge').reshape(-1, w)
+    start = np.arange(len(Y))*w
+    idx = np.concatenate([[0, len(X)-1], start+np.argmin(Y,axis=1), start+np.argmax(Y,axis=1)])
+    idx = np.unique(np.minimum(idx, len(X)-1))
+    return t[idx], X[idx]
+
+# %% Streaming peak
+
+class StreamingPeak:
+    
+    def __init__(self, n):
+        self.n = n # samples per window
+        self.sum = 0.0 # sum of the current window
+        self.count = 0 # samples in the current window
+        self.completed = -np.inf # peak of the completed windows
+    
+    # Mean of the current (incomplete) window
+    @property
+    def mean(self):
+        return self.sum/self.count if self.count else np.nan
+    
+    # Peak of all window means including the current window
+    @property
+    def peak(self):
+        return max(self.completed, self.mean) if self.count else self.completed
+    
+    # Add one sample or an array of samples
+    def update(self, samples):
+        samples = np.atleast_1d(np.asarray(samples, dtype=float))
+        
+        # Complete the current window
+        k = min(self.n-self.count, len(samples))
+        self.sum += np.sum(samples[:k])
+        self.count += k
+        samples = samples[k:]
+        if self.count < self.n:
+            return
+        self.completed = max(self.completed, self.sum/self.n)
+        
+        # Complete windows within the samples and start the next window
+        full = len(samples)//self.n
+        if full:
+            self.completed = max(self.completed, np.max(sums(samples[:full*self.n], self.n))/self.n)
+        self.sum = np.sum(samples[full*self.n:])
+        self.count = len(samples) - full*self.n
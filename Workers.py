@@ -0,0 +1,66 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description: 
+#   This script contains the process pool of 'Sweep', 'Sensitivity',
+#   'Scenarios' and 'PlotExport'. The power profiles are passed once to every
+#   worker (inherited with 'fork' where available) and the tasks read them from
+#   'Workers.Powerprofile'. With one worker the tasks are executed in the
+#   current process. On platforms without 'fork' (e.g. Windows) the default
+#   number of workers is 1, because 'Main' is not protected by 
+#   if __name__ == '__main__'. A process pool can still be requested 
+#   explicitly from protected scripts.
+# -------------
+# Input: 
+#   n_workers, Powerprofile
+# ------------
+# Output: 
+#   executor (concurrent.futures)
+# ------------
+
+# %% Import libraries
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+Powerprofile = None # power profiles of the current process
+
+def init(profiles):
+    global Powerprofile
+    Powerprofile = profiles
+
+# %% Process pool
+
+def fork():
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+def context():
+    return multiprocessing.get_context('fork') if fork() else multiprocessing.get_context()
+
+# Number of workers (None: number of cores, 1 without 'fork')
+def n_workers(n):
+    if n is None and not fork():
+        return 1
+    return n
+
+# Executor that runs the tasks in the current process at submission
+class InProcess(Executor):
+    
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+# Process pool with the power profiles in every worker, in-process for one worker
+def pool(n, Powerprofile=None):
+    n = n_workers(n)
+    if n == 1:
+        init(Powerprofile)
+        return InProcess()
+    return ProcessPoolExecutor(max_workers=n, mp_context=context(),
+                               initializer=init, initargs=(Powerprofile,))
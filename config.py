@@ -5,7 +5,8 @@
 # Version: Python 3.7, Spyder 4.0.1
 # -------------
 # Description: 
-#   This script is used for the parametrisation
+#   This script is used for the parametrisation. The values are used as 
+#   defaults for the parameter set in 'Parameters'
 # ------------
 # Input: 
 #   -
@@ -28,6 +29,9 @@ EOL = 0.8 # EOL criterium [Schmalstieg.2014]
 tmax = 15*365  # maximum calendaric life in days[Hesse.2017]
 nmax = 10000 # maximum cycle life [Hesse.2017]
 T_a = 300 # Ambient temperature in K [Schmalstieg.2014]
+k_dod = 1.1 # Exponent of the DoD stress of the rainflow model (cycle life ~ DoD^-k_dod, 1: as 'linear')
+k_soc = 1.04 # SOC stress coefficient of the rainflow model [Xu.2018]
+soc_ref = 0.5 # Reference SOC of the SOC stress [Xu.2018]
 t_eol_tru = 20 # Lifetime of the transformer rectifier unit in years [Yan.2019]
 t_eol_dcdc = 8 # Lifetime of the dcdc converter in years [Yan.2019]
 
@@ -42,8 +46,42 @@ c_dem_uncontr = 13.35 / 1.378 # Contracted peak demand charge in $/kW (per month
 delta_t = 30 # Time delta for demand charge calculation in Minutes [SPGroup.2019]
 
 # Selected models
-agingmodel = 'linear' # aging model
-algorithm = 'prescient' #algorithm
+agingmodel = 'linear' # aging model ('linear' or 'rainflow')
+algorithm = 'prescient' #algorithm ('prescient', 'prescient_block' or 'lp')
+optimizer = 'nelder_mead' #optimizer ('nelder_mead', 'limit_search' or 'lp', 'lp' uses the 'lp' algorithm)
+
+# Input settings
+profile_store = 'Input/PowerProfileStore' # directory of the memory-mapped power profiles
+profile_dtype = 'float64' # precision of the stored demand ('float64' or 'float32')
+profile_aggregate = False # aggregate the stored profiles where they are piecewise constant
+
+# Compiled kernels
+use_numba = True # use the numba kernels for 'prescient_block' and 'linear' if numba is installed
+
+# Output settings
+result_format = None # partitioned result files by delta_t and BLEL ('parquet' or 'feather', requires pyarrow, None: none)
+result_csv = True # write Results/results.csv
+
+# Sweep settings
+instrumentation = False # write a per-terminal report of the time per stage (Results/profiling.csv)
+n_workers = None # number of worker processes for the sweep (None: number of cores, 1 without 'fork', 1: no process pool)
+cache_dir = 'Results/cache' # directory for the results of finished optimisations (None: no caching)
+warm_start = False # start Nelder-Mead from the solution of the closest solved BLEL/delta_t of the terminal
+warm_step = 0.05 # relative size of the initial simplex around the warm start
+
+# Sensitivity settings
+sensitivity = 'full' # cost grid of the contour plots ('full' or 'adaptive')
+sensitivity_tol = 0.005 # interpolation tolerance of the adaptive grid relative to the lowest costs
+sensitivity_all = False # surfaces of all terminals and BLELs (Results/sensitivity.npz)
+
+# Scenario settings
+scenario_samples = 0 # number of Monte Carlo samples of the cost parameters (Results/scenarios.csv, 0: none)
+
+# Plot settings
+plot_export = False # write the power curve plots of all terminals and the result plots to files (Results/plots)
+
+# Online settings
+online_replay = False # compare the online controllers with the batch result for the single terminal
 
 # Check ups
 if soc_max-soc_min > EOL:
@@ -0,0 +1,72 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description:
+#   Checks of the kernels in 'Kernels' against the reference implementations:
+#   the block-wise prescient algorithm (compiled kernel and numpy loop) against
+#   'Algorithms.prescient' on the synthetic profiles of 'Benchmark' and the
+#   battery throughput against the trapezoidal rule of numpy. The aging model
+#   and the objective function are also run without the kernels.
+#   Usage: python -m pytest test_Kernels.py
+# ------------
+
+# %% Import libraries
+import numpy as np
+import pytest
+
+import Algorithms
+import Benchmark
+import AgingModels
+import Kernels
+import Objective
+import Parameters
+
+trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+@pytest.fixture(scope='module')
+def Powerprofile():
+    return Benchmark.synthetic_powerprofile(n_terminals=2, days=2)
+
+@pytest.mark.parametrize('enabled', [False, True])
+@pytest.mark.parametrize('delta_t', [15, 30])
+def test_prescient_block(Powerprofile, monkeypatch, enabled, delta_t):
+    # Without numba, Kernels.prescient is the same loop in plain Python
+    monkeypatch.setattr(Kernels, 'enabled', enabled)
+    params = Parameters.default(delta_t=delta_t)
+    for BLEL in Powerprofile:
+        for ter, profile in Powerprofile[BLEL].items():
+            time, Demand = profile['time'], profile['Demand']
+            for lim in (0.5*np.mean(Demand), np.mean(Demand), 2*np.mean(Demand), np.max(Demand)):
+                for size in (50.0, 200.0, 1000.0):
+                    expected = Algorithms.prescient(lim, size, time, Demand, params)
+                    actual = Algorithms.prescient_block(lim, size, time, Demand, params)
+                    for e, a in zip(expected, actual):
+                        np.testing.assert_array_equal(a, e)
+
+@pytest.mark.parametrize('step', ['uniform', 'random'])
+def test_throughput(step):
+    rng = np.random.RandomState(0)
+    n = 5000
+    time = np.arange(n)*10.0 if step == 'uniform' else np.cumsum(rng.uniform(1, 20, n))
+    Battery = rng.uniform(-300, 300, n)
+    np.testing.assert_allclose(Kernels.throughput(Battery, time), trapezoid(abs(Battery), time), rtol=1e-12)
+    np.testing.assert_allclose(Kernels._throughput(Battery, time), trapezoid(abs(Battery), time), rtol=1e-12)
+
+# Linear aging model and objective function with and without the kernels
+def test_fallback(Powerprofile, monkeypatch):
+    profile = Powerprofile['BLEL100']['ter_00000']
+    time, Demand = profile['time'], profile['Demand']
+    params = Parameters.default()
+    lim, size = 2*np.mean(Demand), 200.0
+    Battery, _, soc = Algorithms.prescient(lim, size, time, Demand, params)
+    results = {}
+    for enabled in (True, False):
+        monkeypatch.setattr(Kernels, 'enabled', enabled)
+        Objective.clear_cache()
+        results[enabled] = (AgingModels.linear(time, Battery, soc, size, params),
+                            Objective.function([lim, size], time, Demand, [], 'opt', params))
+    assert np.all(np.isfinite(results[False]))
+    np.testing.assert_allclose(results[False], results[True], rtol=1e-12)
@@ -0,0 +1,46 @@
+# Designed by: Florian Trocker, Olaf Teichert (FTM, Technical University of Munich, TUM CREATE Singapore)
+#-------------
+# Created on: 18.10.2026
+# ------------
+# Version: Python 3.7, Spyder 4.0.1
+# -------------
+# Description:
+#   Checks of the adaptive cost surfaces of 'Sensitivity' against the full
+#   grid on the synthetic profiles of 'Benchmark', also for axes where the
+#   optimum coincides with a grid point (duplicate axis values).
+#   Usage: python -m pytest test_Sensitivity.py
+# ------------
+
+# %% Import libraries
+import numpy as np
+import pytest
+
+import Benchmark
+import Parameters
+import Profiles
+import Sensitivity
+
+@pytest.fixture(scope='module')
+def profile():
+    return Benchmark.synthetic_powerprofile(n_terminals=1, days=2)['BLEL100']['ter_00000']
+
+# Optimum inside the grid, on the upper corner and on the lower corner
+@pytest.mark.parametrize('corner', [None, 'upper', 'lower'])
+def test_adaptive(profile, corner):
+    time, Demand = profile['time'], profile['Demand']
+    params = Parameters.default()
+    Peakdemand_z = Profiles.get(time, Demand, params).Peakdemand_z
+    opt_lim, opt_size = {None: (0.9*Peakdemand_z, 150.0), 'upper': (Peakdemand_z, 0.0),
+                         'lower': (np.mean(Demand), 400.0)}[corner]
+    lim, size = Sensitivity.axes(time, Demand, params, opt_lim, opt_size)
+
+    full = Sensitivity.full(lim, size, time, Demand, [], params)
+    adaptive = Sensitivity.adaptive(lim, size, time, Demand, [], params)
+    evaluated = adaptive[-1]
+    for a, f in zip(adaptive[:-1], full[:-1]):
+        np.testing.assert_array_equal(a[evaluated], f[evaluated])
+        # Duplicate axis values (intervals of zero width) have the same costs
+        for i in np.flatnonzero(np.diff(lim) == 0):
+            np.testing.assert_array_equal(a[i], a[i+1])
+        for j in np.flatnonzero(np.diff(size) == 0):
+            np.testing.assert_array_equal(a[:,j], a[:,j+1])